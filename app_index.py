@@ -0,0 +1,103 @@
+import time
+import bisect
+from collections import Counter, defaultdict
+from thefuzz import fuzz
+from text_normalize import normalize_text
+from tracing import traced
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AppIndex:
+    """Precomputed lookup structure for fuzzy app resolution.
+
+    Aliases are accent-folded once at build time. A query first tries an exact
+    match, then collects candidates from a prefix scan and a trigram inverted
+    index; only those candidates are scored with fuzz.WRatio (the scorer
+    process.extractOne uses), so scores stay comparable with the 50/60/70
+    thresholds used by Assistant.
+
+    With a usage store (usage.UsageStore), a query that keeps resolving to
+    the same app returns it without scoring, and equal scores go to the most
+    used app.
+    """
+
+    def __init__(self, aliases, max_candidates=50, usage=None):
+        self.max_candidates = max_candidates
+        self.usage = usage
+        self.aliases = list(aliases)
+        self._folded = [normalize_text(a) for a in self.aliases]
+        self._known = set(self.aliases)
+
+        self._exact = {}
+        self._postings = defaultdict(list)
+        for idx, folded in enumerate(self._folded):
+            self._exact.setdefault(folded, idx)
+            for gram in _trigrams(folded):
+                self._postings[gram].append(idx)
+        self._sorted = sorted((folded, idx) for idx, folded in enumerate(self._folded))
+        self._sorted_keys = [folded for folded, _ in self._sorted]
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def _prefix_candidates(self, query):
+        start = bisect.bisect_left(self._sorted_keys, query)
+        found = []
+        for folded, idx in self._sorted[start:start + self.max_candidates]:
+            if not folded.startswith(query):
+                break
+            found.append(idx)
+        return found
+
+    def _candidates(self, query):
+        counts = Counter()
+        for gram in _trigrams(query):
+            for idx in self._postings.get(gram, ()):
+                counts[idx] += 1
+        candidates = set(self._prefix_candidates(query))
+        candidates.update(idx for idx, _ in counts.most_common(self.max_candidates))
+        return candidates
+
+    @traced("app_match")
+    def extract_one(self, query):
+        """Returns (alias, score) for the best match, like process.extractOne, or None."""
+        if not self.aliases:
+            return None
+        folded = normalize_text(query)
+        if not folded:
+            return None
+
+        idx = self._exact.get(folded)
+        if idx is not None:
+            return self.aliases[idx], 100
+
+        start = time.perf_counter()
+        if self.usage:
+            learned = self.usage.resolved(folded)
+            if learned is not None and learned[0] in self._known:
+                self.usage.note_lookup(True, time.perf_counter() - start)
+                return learned
+
+        candidates = self._candidates(folded)
+        if not candidates:
+            # Nothing shares a trigram with the query: fall back to a full scan
+            candidates = range(len(self.aliases))
+
+        best_idx, best_score = None, -1
+        tie_break = False
+        for idx in sorted(candidates):
+            score = fuzz.WRatio(folded, self._folded[idx])
+            if score > best_score:
+                best_idx, best_score = idx, score
+                tie_break = False
+            elif (score == best_score and self.usage
+                  and self.usage.weight(self.aliases[idx]) > self.usage.weight(self.aliases[best_idx])):
+                best_idx = idx
+                tie_break = True
+        if self.usage:
+            self.usage.note_lookup(False, time.perf_counter() - start, tie_break)
+        return self.aliases[best_idx], best_score
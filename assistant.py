@@ -1,5 +1,4 @@
 import os
-import sys
 from ctypes import *
 
 # Suppress ALSA/Jack error messages
@@ -13,177 +12,325 @@ try:
 except Exception:
     pass
 
-import subprocess
 import webbrowser
-import time
-import glob
-import tempfile
+import threading
+from importlib.util import find_spec
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import quote_plus
-from thefuzz import process, fuzz
-from llm_handler import LLMHandler
+from desktop_cache import DesktopAppCache
+from launcher import Launcher
+from usage import open_store
+from app_index import AppIndex
+from intent_rules import RuleIntentClassifier, OPEN_KEYWORDS, SEARCH_KEYWORDS, split_compound
+from tts_cache import TTSCache
+from youtube_resolver import YouTubeResolver
+from startup import Startup, Lazy, timed_import
+from tracing import tracer, traced
 
-# Try to import speech dependencies, handle gracefully if missing
-try:
-    import speech_recognition as sr
-    HAS_SPEECH_RECOGNITION = True
-except ImportError:
-    HAS_SPEECH_RECOGNITION = False
+# The speech, audio and LLM modules are slow to import (pygame, groq...): they are
+# only looked up here and imported by the startup tasks, in the background.
+sr = None
+gTTS = None
+
+# Check speech dependencies, handle gracefully if missing
+HAS_SPEECH_RECOGNITION = find_spec("speech_recognition") is not None
+if not HAS_SPEECH_RECOGNITION:
     print("Module 'speech_recognition' manquant. Mode texte uniquement.")
 
-# Try to import gTTS and pygame
-try:
-    from gtts import gTTS
-    import pygame
-    HAS_GTTS = True
-except ImportError:
-    HAS_GTTS = False
+# Check gTTS and pygame
+HAS_GTTS = find_spec("gtts") is not None and find_spec("pygame") is not None
+if not HAS_GTTS:
     print("gTTS ou pygame manquant. Voix haute qualité désactivée.")
 
-try:
-    import pyttsx3
-    HAS_TTS = True
-except ImportError:
-    HAS_TTS = False
+HAS_TTS = find_spec("pyttsx3") is not None
+if not HAS_TTS:
     print("Module 'pyttsx3' manquant. Sortie vocale désactivée.")
 
+GREETING = "Bonjour, je suis votre assistant. Que puis-je faire pour vous ?"
+
+# Fixed phrases synthesized ahead of time so they play straight from the cache
+STOCK_PHRASES = [
+    GREETING,
+    "Au revoir !",
+    "Je ne sais pas encore faire cette action.",
+    "Je ne comprends pas. Essayez 'ouvre [app]' ou 'cherche [sujet]'.",
+]
+
 class Assistant:
+    DEFAULT_APPS = {
+         "navigateur": "firefox",
+         "firefox": "firefox",
+         "chrome": "google-chrome",
+         "calculatrice": "gnome-calculator",
+         "éditeur": "gedit",
+         "terminal": "gnome-terminal",
+         "visual studio code": "code",
+         "vs code": "code",
+         "code": "code"
+    }
+
+    # Filled by the startup tasks; reading one waits for its subsystem only
+    engine = Lazy("audio")
+    audio = Lazy("audio")
+    recognizer = Lazy("speech")
+    stt = Lazy("speech")
+    listener = Lazy("speech")
+    wake_gate = Lazy("speech")
+    apps = Lazy("apps")
+    app_index = Lazy("apps")
+    intent_rules = Lazy("apps")
+    llm = Lazy("llm")
+    intent_model = Lazy("model")
+
     def __init__(self, output_callback=None):
         self.running = True
         self.output_callback = output_callback # Function to call for GUI output
-        
-        # Init Pygame Mixer logic
+
+        # Commands run on their own pool; their actions (speech, launch, lookups)
+        # are overlapped on a second one so a command never waits on itself.
+        self._command_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="command")
+        self._action_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="action")
+        # Parts of a compound command; they submit to the action pool, never the reverse
+        self._plan_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="plan")
+
         self.use_gtts = HAS_GTTS
+        self.tts_cache = TTSCache(max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "50")) * 1024 * 1024)
+        self.app_cache = DesktopAppCache()
+        self.launcher = Launcher()
+        self.usage = self._open_usage()
+        self.youtube = YouTubeResolver(budget=float(os.getenv("YOUTUBE_LOOKUP_BUDGET", "1.5")))
+        # Streaming mode dispatches before the full LLM answer has arrived
+        self.llm_streaming = os.getenv("LLM_STREAMING", "0") == "1"
+        # The daemon turns these off: replies play in the background and it has no terminal
+        self.speak_blocking = True
+        self.text_fallback = True
+        # Set by the speech task when partial transcripts are available (SPECULATIVE_INTENTS=1)
+        self.speculator = None
+        # Set while the assistant speaks: the continuous listener drops what it hears meanwhile
+        self.speaking = threading.Event()
+
+        # Independent subsystems start in parallel: the greeting only waits for
+        # the audio output, the microphone calibration and the app scan go on meanwhile.
+        self.startup = Startup(verbose=os.getenv("STARTUP_PROFILE", "0") == "1")
+        self.startup.start("audio", self._init_audio)
+        self.startup.start("speech", self._init_speech)
+        self.startup.start("apps", self._init_apps)
+        self.startup.start("llm", self._init_llm)
+        self.startup.start("model", self._init_model)
+        self.startup.start("youtube", self._init_youtube)
+
+    def _init_audio(self):
+        global gTTS
+        # Init Pygame Mixer logic
         if self.use_gtts:
             try:
-                pygame.mixer.init()
+                gTTS = timed_import("gtts").gTTS
+                timed_import("pygame").mixer.init()
             except Exception as e:
                 print(f"Erreur init Audio: {e}")
                 self.use_gtts = False
 
+        engine = None
         if HAS_TTS:
             try:
-                self.engine = pyttsx3.init()
-                self.engine.setProperty('rate', 175) # Speed of speech
+                engine = timed_import("pyttsx3").init()
+                engine.setProperty('rate', 175) # Speed of speech
             except Exception as e:
                 print(f"Erreur init TTS: {e}")
-                self.engine = None
-        else:
-            self.engine = None
-        
+                engine = None
+
+        self.engine = engine
+        audio_player = timed_import("audio_player")
+        self.audio = audio_player.AudioPlayer(
+            synthesize=self._synthesize_gtts if self.use_gtts else None,
+            engine=engine,
+            speaking=self.speaking,
+        )
+
+        if self.use_gtts:
+            # Greeting and acknowledgements for the built-in and the most used apps
+            names = list(self.DEFAULT_APPS) + [name for name in self.usage.top() if name not in self.DEFAULT_APPS]
+            phrases = STOCK_PHRASES + [f"Ouverture de {name}..." for name in names]
+            # Playback looks the cache up chunk by chunk: cache the same chunks
+            chunks = [chunk for phrase in phrases for chunk in audio_player.split_sentences(phrase)]
+            self.tts_cache.prewarm(chunks, self._gtts_writer)
+
+    def _init_speech(self):
+        global sr
+        recognizer = stt = listener = wake_gate = None
         if HAS_SPEECH_RECOGNITION:
-            self.recognizer = sr.Recognizer()
+            sr = timed_import("speech_recognition")
+            recognizer = sr.Recognizer()
             # Calibration at startup once to correct threshold
             try:
                 with sr.Microphone() as source:
                     print("Calibrage du micro (silence svp)...")
-                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    recognizer.adjust_for_ambient_noise(source, duration=1)
                     print("Calibrage terminé.")
             except Exception as e:
                 print(f"Erreur calibrage: {e}")
-        else:
-            self.recognizer = None
+            # Recognition backends from STT_BACKENDS, tried in order (offline models load here, once)
+            stt = timed_import("recognizers").create_recognizer(recognizer)
 
+        # LISTEN_MODE=continuous keeps the microphone open and cuts utterances with a VAD.
+        # WAKE_WORD_MODE=1 (hands-free) implies it and only keeps what follows the wake word,
+        # spotted locally by the Vosk model of the recognition chain.
+        wake_mode = os.getenv("WAKE_WORD_MODE", "0") == "1"
+        spotter = None
+        if HAS_SPEECH_RECOGNITION and wake_mode:
+            wake_word = timed_import("wake_word")
+            wake_words = [w.strip() for w in os.getenv("WAKE_WORDS", "assistant").split(",") if w.strip()]
+            spotter = wake_word.create_spotter(stt, wake_words)
+            if spotter is None:
+                print("Mode mains libres désactivé : il faut un modèle Vosk local "
+                      "(STT_BACKENDS=vosk,google et VOSK_MODEL_PATH).")
+                wake_mode = False
+        if HAS_SPEECH_RECOGNITION and (wake_mode or os.getenv("LISTEN_MODE", "turn") == "continuous"):
+            listening = timed_import("listener")
+            # Partials of a streaming recognizer start the intent lookup while the user speaks
+            # (not in hands-free mode: the partials still hold the wake word)
+            speculator = frame_hook = None
+            if (os.getenv("SPECULATIVE_INTENTS", "0") == "1" and not wake_mode
+                    and any(hasattr(b, "start_stream") for b in stt.backends)):
+                speculation = timed_import("speculation")
+                speculator = speculation.SpeculativeResolver(
+                    self.speculate_intent, commit=self.commit_speculation,
+                    stable_feeds=int(os.getenv("SPECULATION_STABILITY", "3")))
+                frame_hook = speculation.PartialTranscriber(
+                    stt.start_stream, speculator,
+                    convert=lambda frame, rate, width: sr.AudioData(frame, rate, width).get_raw_data(
+                        convert_rate=16000, convert_width=2))
+            try:
+                listener = listening.BackgroundListener(
+                    listening.MicrophoneSource(),
+                    energy_threshold=recognizer.energy_threshold,
+                    frame_hook=frame_hook,
+                    mute=self.speaking,
+                ).start()
+                self.speculator = speculator
+            except Exception as e:
+                print(f"Erreur écoute continue: {e}")
+        if listener and wake_mode:
+            wake_gate = wake_word.WakeWordGate(spotter, stt, wake_words)
+            print(f"Mode mains libres : dites '{wake_words[0]}' suivi de votre commande.")
 
-        self.apps = self._load_installed_apps()
-        self.llm = LLMHandler()
+        self.recognizer, self.stt = recognizer, stt
+        self.listener, self.wake_gate = listener, wake_gate
 
-    def _load_installed_apps(self):
-        """Scans for installed apps in .desktop files."""
+    def _init_apps(self):
+        apps = self._load_installed_apps()
+        app_index = AppIndex(apps, usage=self.usage)
+        self.apps, self.app_index = apps, app_index
+        self.intent_rules = RuleIntentClassifier(app_index)
+        # The usual apps' programs are looked up (and optionally read from disk) before they are asked for
+        self.launcher.prewarm([apps[alias] for alias in self.usage.top() if alias in apps],
+                              preread=os.getenv("USAGE_PREREAD", "0") == "1")
+
+    def _open_usage(self):
+        # Counts of the apps opened, decaying over days (usage.py)
+        return open_store()
+
+    def _init_llm(self):
+        self.llm = timed_import("llm_handler").LLMHandler()
+
+    def _init_model(self):
+        # Trained with "python intent_model.py train"; None until then
+        intent_model = timed_import("intent_model")
+        self.intent_model = intent_model.IntentModel.load() if intent_model.HAS_NUMPY else None
+
+    def _init_youtube(self):
+        # Loads yt_dlp so the first "joue ..." doesn't pay for it
+        self.youtube.warm_up().result()
+
+    def stats(self):
+        """Intent, TTS cache and audio statistics (printed by the console on exit)."""
+        return {
+            "intents": self.intent_rules.stats(),
+            "tts": self.tts_cache.stats(),
+            "audio": self.audio.stats(),
+            "launcher": self.launcher.stats(),
+            "usage": self.usage.stats(),
+            # The recognition chain's audio_preprocess stage (AUDIO_PREPROCESS)
+            "preprocess": self.stt.preprocessor.stats() if hasattr(self.stt, "preprocessor") else None,
+            "speculation": self.speculator.stats() if self.speculator else None,
+            "model": self.intent_model.stats() if self.intent_model else None,
+        }
+
+
+    def latency_report(self):
+        """p50/p95/p99 per traced stage (TRACE=1)."""
+        return tracer.report()
+
+    def startup_report(self):
+        """Per-subsystem import and init times (waits for every subsystem)."""
+        self.startup.wait_all()
+        return self.startup.report()
+
+    def _load_installed_apps(self, force_rebuild=False):
+        """Loads installed apps from the .desktop index (cached on disk)."""
         apps = {}
         # Default/Hardcoded overrides
-        apps.update({
-             "navigateur": "firefox",
-             "firefox": "firefox",
-             "chrome": "google-chrome",
-             "calculatrice": "gnome-calculator",
-             "éditeur": "gedit",
-             "terminal": "gnome-terminal",
-             "visual studio code": "code",
-             "vs code": "code",
-             "code": "code"
-        })
-
-        search_paths = [
-            "/usr/share/applications",
-            os.path.expanduser("~/.local/share/applications")
-        ]
-        
-        for path in search_paths:
-            if not os.path.exists(path):
-                continue
-                
-            for filepath in glob.glob(os.path.join(path, "*.desktop")):
-                try:
-                    with open(filepath, "r", errors="ignore") as f:
-                        content = f.read()
-                        
-                    name = None
-                    name_fr = None
-                    exec_cmd = None
-                    no_display = False
-                    
-                    for line in content.splitlines():
-                        if line.startswith("Name="):
-                            name = line.split("=", 1)[1].strip()
-                        elif line.startswith("Name[fr]="):
-                            name_fr = line.split("=", 1)[1].strip()
-                        elif line.startswith("Exec="):
-                            exec_cmd = line.split("=", 1)[1].strip()
-                        elif line.startswith("NoDisplay=true"):
-                            no_display = True
-                            
-                            
-                    if exec_cmd and not no_display:
-                        # Clean up exec command
-                        exec_cmd = exec_cmd.split()[0] # Take first part (ignore args like %U)
-                        
-                        # Use filename as a fallback/alias (e.g. windsurf.desktop -> windsurf)
-                        base_name = os.path.splitext(os.path.basename(filepath))[0].lower()
-                        apps[base_name] = exec_cmd
-
-                        if name:
-                            apps[name.lower()] = exec_cmd
-                        if name_fr:
-                            apps[name_fr.lower()] = exec_cmd
-                            
-                except Exception:
-                    pass
-        print(f"Applications chargées : {len(apps)}")
+        apps.update(self.DEFAULT_APPS)
+
+        apps.update(self.app_cache.load(force_rebuild=force_rebuild))
+        stats = self.app_cache.stats
+        mode = "à froid" if stats["mode"] == "cold" else "à chaud"
+        print(f"Applications chargées : {len(apps)} ({mode}, {stats['parsed']} analysées, {stats['load_ms']:.1f} ms)")
         return apps
 
+    def rebuild_app_index(self):
+        """Forces a full rescan of the .desktop files and refreshes self.apps."""
+        self.apps = self._load_installed_apps(force_rebuild=True)
+        self.app_index = AppIndex(self.apps, usage=self.usage)
+        self.intent_rules.app_index = self.app_index
+        return self.apps
+
+    def _notify(self, message):
+        """Prints a message and forwards it to the GUI callback."""
+        print(message)
+        if self.output_callback:
+            self.output_callback(message)
+
+    def _report_failure(self, future):
+        """Done-callback reporting errors raised by background actions."""
+        if not future.cancelled() and future.exception() is not None:
+            self._notify(f"Erreur: {future.exception()}")
+
+    def _run_concurrently(self, *calls):
+        """Runs (fn, *args) calls in parallel on the action pool and waits for all of them."""
+        futures = []
+        for fn, *args in calls:
+            # bind(): spans of the action stay children of the current command
+            future = self._action_executor.submit(tracer.bind(fn), *args)
+            future.add_done_callback(self._report_failure)
+            futures.append(future)
+        wait(futures)
+        return futures
+
+    @traced("speak")
     def speak(self, text):
         """Outputs text via gTTS (High Quality) or pyttsx3 (Fallback)."""
-        print(f"IA: {text}")
-        if self.output_callback:
-            self.output_callback(f"IA: {text}")
-        
-        # Try gTTS first if available
-        if self.use_gtts:
-            try:
-                tts = gTTS(text=text, lang='fr')
-                filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speech.mp3")
-                # Unload previous music to release file lock
-                pygame.mixer.music.unload()
-                tts.save(filename)
-                pygame.mixer.music.load(filename)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10) 
-                time.sleep(0.5) # Anti-echo buffer
-                return
-            except Exception as e:
-                print(f"Erreur gTTS (Internet HS ?): {e}")
-                # Fallthrough to pyttsx3
+        self._notify(f"IA: {text}")
+        # The audio worker plays one utterance at a time, concurrent callers queue up
+        self.audio.speak(text, block=self.speak_blocking)
 
-        # Fallback
-        if self.engine:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        
-        time.sleep(0.5) # Anti-echo buffer
+    def interrupt_speech(self):
+        """Barge-in: stops the current utterance and drops the queued ones."""
+        self.audio.interrupt()
 
+    def _synthesize_gtts(self, text):
+        # Cached phrases skip the network synthesis entirely
+        return self.tts_cache.get_or_create(text, self._gtts_writer(text))
+
+    def _gtts_writer(self, text):
+        """Returns a synthesize(fp) function writing the gTTS mp3 for text."""
+        return lambda fp: gTTS(text=text, lang='fr').write_to_fp(fp)
+
+    @traced("listen")
     def listen(self):
-        """Listens for voice input or falls back to text."""
+        """Listens for voice input or falls back to text (None if text_fallback is off)."""
+        if self.listener:
+            return self._listen_continuous()
         if HAS_SPEECH_RECOGNITION:
             try:
                 # Re-use recognizer settings, don't re-adjust every time
@@ -192,7 +339,7 @@ class Assistant:
                     # self.recognizer.adjust_for_ambient_noise(source) # MOVED TO INIT
                     audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
                     print("(Traitement...)")
-                    text = self.recognizer.recognize_google(audio, language="fr-FR")
+                    text = self.stt.recognize(audio)
                     print(f"Vous (Vocal): {text}")
                     return text.lower()
             except (ImportError, AttributeError, OSError) as e:
@@ -213,7 +360,37 @@ class Assistant:
         else:
             return self._text_input()
 
+    def _listen_continuous(self):
+        """Takes the next utterance cut by the background listener."""
+        if not self.wake_gate:
+            print("\n(Écoute...)")
+        audio = self.listener.get(timeout=5)
+        if audio is None:
+            return ""
+        try:
+            if self.wake_gate:
+                # Background chatter is dropped here, before recognition and the LLM
+                text = self.wake_gate.process(audio)
+                if not text:
+                    return ""
+            else:
+                print("(Traitement...)")
+                text = self.stt.recognize(audio)
+            print(f"Vous (Vocal): {text}")
+            return text.lower()
+        except sr.UnknownValueError:
+            print("Je n'ai pas compris.")
+            return ""
+        except sr.RequestError as e:
+            print(f"Erreur service vocal: {e}")
+            return "" if self.wake_gate else self._text_input()
+        except Exception as e:
+            print(f"Autre erreur vocal: {e}")
+            return "" if self.wake_gate else self._text_input()
+
     def _text_input(self):
+        if not self.text_fallback:
+            return None # No terminal: the caller asks for the text itself
         try:
             return input("Vous (Texte): ").strip().lower()
         except EOFError:
@@ -222,57 +399,211 @@ class Assistant:
     def open_app(self, app_name):
         """Legacy method retained but mostly replaced by process_command logic."""
         # Check against fuzzy apps now
-        result = process.extractOne(app_name, list(self.apps.keys()))
+        result = self.app_index.extract_one(app_name)
         if result and result[1] > 70:
              best_match, score = result[0], result[1]
-             cmd = self.apps[best_match]
-             self.speak(f"Ouverture de {best_match}...")
-             subprocess.Popen(cmd, shell=True, stderr=subprocess.PIPE)
+             self._open_matched(best_match, app_name, score, f"Ouverture de {best_match}...")
         else:
              self.speak(f"Application '{app_name}' non trouvée.")
 
+    def _open_matched(self, alias, query, score, ack):
+        """Speaks ack while the app launches; a successful launch feeds the usage-based ranking."""
+        _, launch = self._run_concurrently(
+            (self.speak, ack),
+            (self._launch, self.apps[alias]),
+        )
+        if launch.exception() is None:
+            self.usage.record(alias, query, score)
+
+    @traced("action.launch")
+    def _launch(self, cmd):
+        # Direct exec, output detached, reaped in the background (launcher.py)
+        self.launcher.launch(cmd)
+
+    @traced("action.open_url")
+    def _open_url(self, url):
+        webbrowser.open(url)
+
     def play_youtube(self, query):
         """Plays the first YouTube video matching the query."""
-        self.speak(f"Lecture de '{query}' sur YouTube...")
-        try:
-            # Use yt-dlp to get the first video URL from YouTube search
-            # Use yt-dlp from the same venv as the running Python
-            yt_dlp_path = os.path.join(os.path.dirname(sys.executable), "yt-dlp")
-            result = subprocess.run(
-                [yt_dlp_path, f"ytsearch1:{query}", "--get-id", "--no-warnings"],
-                capture_output=True, text=True, timeout=10
-            )
-            video_id = result.stdout.strip()
-            if video_id:
-                url = f"https://www.youtube.com/watch?v={video_id}"
-            else:
-                url = f"https://www.youtube.com/results?search_query={quote_plus(query)}"
-        except Exception as e:
-            print(f"Erreur yt-dlp: {e}")
-            url = f"https://www.youtube.com/results?search_query={quote_plus(query)}"
-        webbrowser.open(url)
+        # The video lookup runs while the acknowledgement is being spoken
+        self._run_concurrently(
+            (self.speak, f"Lecture de '{query}' sur YouTube..."),
+            (self._open_youtube, query),
+        )
+
+    def _open_youtube(self, query):
+        # Falls back to the search results page if the lookup exceeds its budget
+        self._open_url(self.youtube.resolve(query))
 
     def search_web(self, query):
         """Searches the web."""
         url = f"https://www.google.com/search?q={quote_plus(query)}"
         if "youtube" in query:
-             self.speak(f"Recherche de '{query}' sur YouTube...")
+             message = f"Recherche de '{query}' sur YouTube..."
              clean_query = query.replace('youtube', '').strip()
              url = f"https://www.youtube.com/results?search_query={quote_plus(clean_query)}"
         else:
-            self.speak(f"Recherche de '{query}' sur internet...")
+            message = f"Recherche de '{query}' sur internet..."
         
-        webbrowser.open(url)
+        self._run_concurrently((self.speak, message), (self._open_url, url))
+
+    def process_command_async(self, command, on_done=None):
+        """Processes a command in the background and returns its Future.
+
+        on_done(command, future) is called on completion; errors are reported
+        through output_callback.
+        """
+        future = self._command_executor.submit(self.process_command, command)
 
+        def done(f):
+            self._report_failure(f)
+            if on_done:
+                on_done(command, f)
+
+        future.add_done_callback(done)
+        return future
+
+    def close(self):
+        """Stops the background pools (pending actions are dropped) and the listener."""
+        self.startup.wait_all()
+        if self.listener:
+            self.listener.stop()
+        if self.speculator:
+            self.speculator.close()
+        self._command_executor.shutdown(wait=False, cancel_futures=True)
+        self._action_executor.shutdown(wait=False, cancel_futures=True)
+        self._plan_executor.shutdown(wait=False, cancel_futures=True)
+
+    @traced("command")
     def process_command(self, command):
-        """Interprets and executes the command using LLM."""
+        """Interprets and executes the command using LLM (blocking façade)."""
         if not command:
             return
 
-        # Use LLM to understand intent
-        intent = self.llm.predict_intent(command)
-        print(f"DEBUG LLM: {intent}")
-        
+        dispatched = []
+
+        def on_ready(partial):
+            # Streaming mode: act as soon as the action and its fields are known
+            if self.execute_intent(partial):
+                dispatched.append(partial)
+
+        # Resolved from the partial transcript while the user was still speaking?
+        intent = self.speculator.take(command) if self.speculator else None
+        if intent is None:
+            intent = self.resolve_intent(command, on_ready)
+        if dispatched:
+            return
+
+        if self.execute_intent(intent):
+            return
+        self._legacy_fallback(command)
+
+    @traced("intent")
+    def resolve_intent(self, command, on_ready=None):
+        """Intent for command: local rules first, then the learned model, then the LLM.
+
+        In streaming mode on_ready(partial) is called as soon as the LLM answer
+        holds an actionable intent.
+        """
+        # Unambiguous commands are resolved locally, the LLM handles the rest
+        intent = self.intent_rules.match(command)
+        if intent is not None:
+            print(f"DEBUG local: {intent}")
+        elif self.intent_model and len(split_compound(command)) == 1:
+            # Single commands the model has learned from past LLM answers
+            intent = self.intent_model.match(command)
+            if intent is not None:
+                print(f"DEBUG modèle: {intent}")
+
+        if intent is not None:
+            return intent
+        if self.llm_streaming:
+            intent = self.llm.predict_intent_stream(command, on_ready)
+            print(f"DEBUG LLM (stream): {intent} {self.llm.last_stream_timings}")
+        else:
+            intent = self.llm.predict_intent(command)
+            print(f"DEBUG LLM: {intent}")
+
+        if intent.get("action") == "error":
+            # API failing or circuit open: best local guess rather than nothing
+            local = self.intent_rules.classify(command)
+            if local.get("action") != "unknown" or local.get("intents"):
+                print(f"DEBUG local (LLM indisponible): {local}")
+                return local
+        return intent
+
+    def speculate_intent(self, command):
+        """resolve_intent() for a partial transcript, without its side effects.
+
+        Returns (intent, stage): the rule/model counters, the LLM log and
+        cache are only updated by commit_speculation(), if the speculation
+        is used.
+        """
+        intent = self.intent_rules.peek(command)
+        if intent is not None:
+            return intent, "rules"
+        if self.intent_model and len(split_compound(command)) == 1:
+            intent = self.intent_model.peek(command)
+            if intent is not None:
+                return intent, "model"
+        intent = self.llm.predict_intent(command, use_cache=False, record=False)
+        if intent.get("action") == "error":
+            local = self.intent_rules.classify(command)
+            if local.get("action") != "unknown" or local.get("intents"):
+                return local, "fallback"
+        return intent, "llm"
+
+    def commit_speculation(self, command, result):
+        """Side effects of a used speculation, as resolve_intent() on the final transcript has them."""
+        intent, stage = result
+        self.intent_rules.record(stage == "rules")
+        if stage != "rules" and self.intent_model and len(split_compound(command)) == 1:
+            self.intent_model.record(stage == "model")
+        if stage == "llm":
+            self.llm.record_answer(command, intent)
+        print(f"DEBUG spéculation ({stage}): {intent}")
+        return intent
+
+    def plan_intents(self, intents):
+        """Groups the intents of a compound command into stages.
+
+        Intents of a stage run in parallel, stages run one after the other. An
+        intent marked "sequential" ("puis", "ensuite") starts a new stage and
+        quit/close always comes last.
+        """
+        stages = []
+        final = []
+        for intent in intents:
+            if intent.get("action") in ("quit", "close"):
+                final.append(intent)
+            elif not stages or intent.get("sequential"):
+                stages.append([intent])
+            else:
+                stages[-1].append(intent)
+        if final:
+            stages.append(final[:1])
+        return stages
+
+    @traced("plan")
+    def execute_plan(self, intents):
+        """Runs the intents of a compound command. Returns True if any was handled."""
+        handled = False
+        for stage in self.plan_intents(intents):
+            if len(stage) == 1:
+                results = [self.execute_intent(stage[0])]
+            else:
+                futures = [self._plan_executor.submit(tracer.bind(self.execute_intent), intent) for intent in stage]
+                wait(futures)
+                results = [future.result() for future in futures]
+            handled = any(results) or handled
+        return handled
+
+    @traced("dispatch")
+    def execute_intent(self, intent):
+        """Runs a structured intent. Returns False if it should go to the keyword fallback."""
+        if intent.get("intents"):
+            return self.execute_plan(intent["intents"])
         action = intent.get("action")
         target = intent.get("target")
         search = intent.get("search")
@@ -284,34 +615,39 @@ class Assistant:
         if action == "quit" or action == "close":
             self.speak("Au revoir !")
             self.running = False
-            return
+            return True
 
         if action == "open" and target and self.apps:
             # Fuzzy match target against installed apps
-            result = process.extractOne(target, list(self.apps.keys()))
+            result = self.app_index.extract_one(target)
             if result and result[1] > 50:
                 best_match, score = result[0], result[1]
-                app_cmd = self.apps[best_match]
-                self.speak(f"Ouverture de {best_match}...")
-                subprocess.Popen(app_cmd, shell=True, stderr=subprocess.PIPE)
+                # Resolved by the local rules: remember the words actually spoken
+                query = intent.get("query", target)
+                score = intent.get("match_score", score)
+                self._open_matched(best_match, query, score, f"Ouverture de {best_match}...")
             else:
                 self.speak(f"Je n'ai pas trouvé l'application '{target}'.")
-            return
+            return True
 
         if action == "search" and search:
             self.search_web(search)
-            return
+            return True
         
         if action == "play":
             if search:
                 self.play_youtube(search)
-            return
+            return True
 
         if action not in ("error", "unknown") and confidence >= 0.4:
             # LLM understood but action not handled above
             self.speak("Je ne sais pas encore faire cette action.")
-            return
+            return True
+
+        return False
 
+    def _legacy_fallback(self, command):
+        """Keyword-based interpretation, used when no usable intent was found."""
         # Fallback to legacy logic if LLM is unsure or errored
         
         # --- LEGACY FALLBACK LOGIC ---
@@ -327,8 +663,8 @@ class Assistant:
         # We can use keywords or even fuzzy match against "intent sentences"
         
         # Simple keyword checks first for speed
-        open_keywords = ["ouvre", "ouvrir", "lance", "lancer", "démarrer", "démarre", "start", "open"]
-        search_keywords = ["cherche", "recherche", "trouve", "trouver", "google", "search"]
+        open_keywords = OPEN_KEYWORDS
+        search_keywords = SEARCH_KEYWORDS
         
         # Check for web search specifically ("sur youtube", etc.)
         if "youtube" in command:
@@ -349,13 +685,11 @@ class Assistant:
                 target_app = target_app.replace(k, "").strip()
             
             # Fuzzy match against loaded apps
-            result = process.extractOne(target_app, list(self.apps.keys()))
+            result = self.app_index.extract_one(target_app)
             
             if result and result[1] > 60: # Threshold
                 best_match = result[0]
-                app_cmd = self.apps[best_match]
-                self.speak(f"Lancement de {best_match}...")
-                subprocess.Popen(app_cmd, shell=True, stderr=subprocess.PIPE)
+                self._open_matched(best_match, target_app, result[1], f"Lancement de {best_match}...")
                 return
             else:
                  self.speak(f"Je n'ai pas trouvé l'application proche de '{target_app}'.")
@@ -0,0 +1,191 @@
+import io
+import re
+import time
+import queue
+import threading
+from collections import deque
+from tracing import tracer
+
+try:
+    import pygame
+    HAS_PYGAME = True
+except ImportError:
+    HAS_PYGAME = False
+
+# Sentence ends, then clause separators for chunks that are still too long
+_SENTENCE_RE = re.compile(r"(?<=[.!?…;:])\s+")
+_CLAUSE_RE = re.compile(r"(?<=,)\s+")
+
+
+def split_sentences(text, max_len=120, min_len=25):
+    """Splits text into speakable chunks: sentences, then clauses for long sentences.
+
+    Chunks shorter than min_len are merged with the next one so short
+    phrases ("Ouverture de firefox...") stay a single synthesis call.
+    """
+    pieces = []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        if len(sentence) > max_len:
+            pieces.extend(_CLAUSE_RE.split(sentence))
+        elif sentence:
+            pieces.append(sentence)
+
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) < min_len:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+class _Utterance:
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.queued_at = time.perf_counter()
+        self.first_sound = None
+        self.span = tracer.current() # Synthesis/playback spans go under the caller's span
+
+
+class AudioPlayer:
+    """Single audio worker: utterances are queued and played one at a time from memory.
+
+    synthesize(text) must return mp3 bytes (played through pygame from a
+    BytesIO, no temp file); when it fails or pygame is unavailable the
+    pyttsx3 engine is used instead. Long texts are split into sentences and
+    chunk N+1 is synthesized while chunk N plays. interrupt() stops the
+    current utterance and drops the queued ones (barge-in). speaking is set
+    while an utterance plays (echo delay included), so a microphone that
+    stays open can ignore the assistant's own voice.
+    """
+
+    def __init__(self, synthesize=None, engine=None, echo_delay=0.5, speaking=None):
+        self.synthesize = synthesize if HAS_PYGAME else None
+        self.engine = engine
+        self.echo_delay = echo_delay
+        self.speaking = speaking or threading.Event()
+        self._queue = queue.Queue()
+        self._interrupt = threading.Event()
+        # Time-to-first-sound (seconds) of the last utterances
+        self.first_sound_times = deque(maxlen=100)
+        self._worker = threading.Thread(target=self._run, name="audio", daemon=True)
+        self._worker.start()
+
+    def speak(self, text, block=True):
+        """Queues text for playback; waits until it has been played if block is True."""
+        utterance = _Utterance(text)
+        self._queue.put(utterance)
+        if block:
+            utterance.done.wait()
+        return utterance.done
+
+    def interrupt(self):
+        """Stops the utterance being played and discards pending ones."""
+        while True:
+            try:
+                self._queue.get_nowait().done.set()
+            except queue.Empty:
+                break
+        self._interrupt.set()
+        if self.engine:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+
+    def stats(self):
+        times = list(self.first_sound_times)
+        return {
+            "utterances": len(times),
+            "first_sound_ms": times[-1] * 1000 if times else 0.0,
+            "avg_first_sound_ms": sum(times) * 1000 / len(times) if times else 0.0,
+        }
+
+    def _run(self):
+        while True:
+            utterance = self._queue.get()
+            self._interrupt.clear()
+            self.speaking.set()
+            try:
+                self._play(utterance)
+            except Exception as e:
+                print(f"Erreur audio: {e}")
+            finally:
+                self.speaking.clear()
+                utterance.done.set()
+
+    def _mark_first_sound(self, utterance):
+        if utterance.first_sound is None:
+            utterance.first_sound = time.perf_counter() - utterance.queued_at
+            self.first_sound_times.append(utterance.first_sound)
+
+    def _play(self, utterance):
+        chunks = split_sentences(utterance.text)
+        if self.synthesize:
+            remaining = self._play_pipelined(utterance, chunks)
+        else:
+            remaining = chunks
+
+        # Fallback (pyttsx3), for everything gTTS could not play
+        for chunk in remaining:
+            if not self.engine or self._interrupt.is_set():
+                break
+            self._mark_first_sound(utterance)
+            with tracer.span("playback.pyttsx3", parent=utterance.span):
+                self.engine.say(chunk)
+                self.engine.runAndWait()
+
+        if not self._interrupt.is_set():
+            time.sleep(self.echo_delay) # Anti-echo buffer
+
+    def _play_pipelined(self, utterance, chunks):
+        """Plays chunks while the next ones are synthesized. Returns the chunks left unplayed."""
+        buffers = queue.Queue()
+
+        def produce():
+            for i, chunk in enumerate(chunks):
+                if self._interrupt.is_set() or utterance.done.is_set():
+                    break
+                try:
+                    with tracer.span("synthesis", parent=utterance.span, chars=len(chunk)):
+                        data = self.synthesize(chunk)
+                    buffers.put((i, data))
+                except Exception as e:
+                    print(f"Erreur gTTS (Internet HS ?): {e}")
+                    buffers.put((i, None))
+                    return
+            buffers.put(None)
+
+        threading.Thread(target=produce, name="tts-synth", daemon=True).start()
+        while True:
+            item = buffers.get()
+            if item is None:
+                return []
+            i, data = item
+            if data is None:
+                # Fallthrough to pyttsx3 for this chunk and the following ones
+                return chunks[i:]
+            self._mark_first_sound(utterance)
+            try:
+                with tracer.span("playback", parent=utterance.span):
+                    played = self._play_buffer(data)
+                if not played:
+                    return []
+            except Exception as e:
+                print(f"Erreur lecture audio: {e}")
+                return chunks[i:]
+
+    def _play_buffer(self, data):
+        """Plays mp3 bytes. Returns False if interrupted."""
+        if self._interrupt.is_set():
+            return False
+        pygame.mixer.music.load(io.BytesIO(data), "mp3")
+        pygame.mixer.music.play()
+        clock = pygame.time.Clock()
+        while pygame.mixer.music.get_busy():
+            if self._interrupt.is_set():
+                pygame.mixer.music.stop()
+                return False
+            clock.tick(20)
+        return True
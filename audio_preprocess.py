@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+from tracing import traced
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# AUDIO_PREPROCESS=1 (default, needs NumPy): every recognizer backend receives the
+# utterance trimmed of its leading/trailing silence, as 16 kHz mono 16-bit PCM with
+# normalized gain, instead of the raw capture at the device rate.
+
+
+class NoSpeech(Exception):
+    """Nothing above the silence threshold: there is nothing to recognize."""
+
+
+def decode_pcm(data, sample_width, channels=1):
+    """Raw little-endian PCM (8-bit unsigned as in WAV, wider signed) -> float32 in [-1, 1], mono."""
+    if sample_width == 1:
+        samples = np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128
+        scale = 128.0
+    elif sample_width == 3:
+        # 24-bit: widen each sample to 32 bits (sign from the high byte)
+        raw = np.frombuffer(data, dtype=np.uint8)
+        raw = raw[:len(raw) - len(raw) % 3].reshape(-1, 3)
+        samples = (raw[:, 0].astype(np.int32) | raw[:, 1].astype(np.int32) << 8
+                   | raw[:, 2].astype(np.int8).astype(np.int32) << 16)
+        scale = float(1 << 23)
+    else:
+        dtype = {2: np.int16, 4: np.int32}[sample_width]
+        samples = np.frombuffer(data, dtype=dtype)
+        scale = float(np.iinfo(dtype).max + 1)
+    samples = samples.astype(np.float32) / scale
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def lowpass_kernel(cutoff, taps=63):
+    """Windowed-sinc FIR low-pass; cutoff as a fraction of the sample rate (< 0.5)."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(samples, rate, target_rate):
+    """Anti-aliased linear-interpolation resampling (quality enough for speech recognition)."""
+    if rate == target_rate or not len(samples):
+        return samples
+    if target_rate < rate:
+        # Remove what the new rate cannot represent before decimating
+        samples = np.convolve(samples, lowpass_kernel(0.45 * target_rate / rate), mode="same")
+    positions = np.arange(int(len(samples) * target_rate / rate)) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+class AudioPreprocessor:
+    """Vectorized clean-up of an utterance before recognition.
+
+    1. downmix to mono; 2. trim leading/trailing silence: frames whose RMS
+    is below max(floor_db, noise floor + margin_db) dBFS are cut, keeping
+    pad_ms around the speech (a clip that is speech throughout, so with
+    nothing standing out, is kept whole); 3. resample to target_rate;
+    4. scale the speech to target_rms_db dBFS, with at most max_gain_db of
+    gain and no clipping. The result is 16-bit PCM.
+    """
+
+    def __init__(self, target_rate=16000, frame_ms=20, floor_db=-50.0, margin_db=12.0, pad_ms=200,
+                 target_rms_db=-20.0, max_gain_db=20.0):
+        self.target_rate = target_rate
+        self.frame_ms = frame_ms
+        self.floor_db = floor_db
+        self.margin_db = margin_db
+        self.pad_ms = pad_ms
+        self.target_rms_db = target_rms_db
+        self.max_gain_db = max_gain_db
+        self._lock = threading.Lock()
+        self.counters = {"utterances": 0, "bytes_in": 0, "bytes_out": 0, "silent": 0, "seconds": 0.0}
+
+    def speech_bounds(self, samples, rate):
+        """(start, end) sample indices of the speech, or None if it is all silence."""
+        frame = max(1, int(rate * self.frame_ms / 1000))
+        count = len(samples) // frame
+        if count == 0:
+            return None
+        frames = samples[:count * frame].reshape(count, frame)
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        threshold = max(self.floor_db, float(np.percentile(energy_db, 10)) + self.margin_db)
+        voiced = np.flatnonzero(energy_db > threshold)
+        if not len(voiced):
+            # Nothing stands out from the rest: either silence, or speech with no silence
+            # around it to compare with (a capture cut by phrase_time_limit) -> kept whole
+            if np.any(energy_db > self.floor_db):
+                return 0, len(samples)
+            return None
+        pad = int(rate * self.pad_ms / 1000)
+        return max(0, voiced[0] * frame - pad), min(len(samples), (voiced[-1] + 1) * frame + pad)
+
+    def normalize(self, samples):
+        rms = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+        if rms <= 0 or peak <= 0:
+            return samples
+        gain = min(10 ** (self.target_rms_db / 20) / rms, 10 ** (self.max_gain_db / 20), 0.98 / peak)
+        return samples * gain
+
+    def process_pcm(self, data, sample_rate, sample_width, channels=1):
+        """Raw PCM -> 16-bit mono PCM at target_rate. Raises NoSpeech for a silent capture."""
+        start = time.perf_counter()
+        samples = decode_pcm(data, sample_width, channels)
+        bounds = self.speech_bounds(samples, sample_rate)
+        if bounds is None:
+            self._count(len(data), 0, time.perf_counter() - start, silent=True)
+            raise NoSpeech()
+        samples = resample(samples[bounds[0]:bounds[1]], sample_rate, self.target_rate)
+        samples = self.normalize(samples)
+        out = np.clip(np.round(samples * 32767), -32768, 32767).astype("<i2").tobytes()
+        self._count(len(data), len(out), time.perf_counter() - start)
+        return out
+
+    @traced("audio.preprocess")
+    def process(self, audio):
+        """sr.AudioData -> cleaned-up sr.AudioData (16 kHz mono 16-bit)."""
+        data = self.process_pcm(audio.frame_data, audio.sample_rate, audio.sample_width)
+        return type(audio)(data, self.target_rate, 2)
+
+    def _count(self, bytes_in, bytes_out, seconds, silent=False):
+        with self._lock:
+            self.counters["utterances"] += 1
+            self.counters["bytes_in"] += bytes_in
+            self.counters["bytes_out"] += bytes_out
+            self.counters["silent"] += silent
+            self.counters["seconds"] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        seconds = stats.pop("seconds")
+        stats["avg_ms"] = seconds * 1000 / stats["utterances"] if stats["utterances"] else 0.0
+        stats["size_ratio"] = stats["bytes_out"] / stats["bytes_in"] if stats["bytes_in"] else 1.0
+        return stats
+
+
+def create_preprocessor():
+    """The preprocessor configured by AUDIO_PREPROCESS, or None (disabled or no NumPy)."""
+    if os.getenv("AUDIO_PREPROCESS", "1") != "1":
+        return None
+    if not HAS_NUMPY:
+        print("Prétraitement audio désactivé : NumPy manquant (pip install numpy)")
+        return None
+    return AudioPreprocessor(target_rms_db=float(os.getenv("AUDIO_TARGET_RMS_DB", "-20")))
@@ -0,0 +1,245 @@
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from assistant import Assistant
+from app_index import AppIndex
+from desktop_cache import DesktopAppCache
+from intent_rules import RuleIntentClassifier
+from usage import UsageStore
+from tracing import percentiles
+from youtube_resolver import search_url
+
+# Usage: python batch.py [fichier|-] [--workers 4] [--in-flight 8] [--offline] [-v]
+# Runs the commands of a file (default: commands_fr.txt) or stdin without any
+# device: launches, browser tabs and speech are recorded instead of happening.
+# Reports per-stage latency (intent, match, action) and the throughput.
+
+STAGES = ("intent", "match", "action")
+
+# Installed applications of the benchmark, whatever the machine has:
+# (.desktop file name, Name, Name[fr], Exec)
+CORPUS_APPS = [
+    ("firefox", "Firefox Web Browser", "Navigateur web Firefox", "firefox %u"),
+    ("google-chrome", "Google Chrome", None, "/usr/bin/google-chrome-stable %U"),
+    ("code", "Visual Studio Code", None, "/usr/share/code/code --unity-launch %F"),
+    ("org.gnome.Calculator", "Calculator", "Calculatrice", "gnome-calculator"),
+    ("org.gnome.gedit", "Text Editor", "Éditeur de texte", "gedit %U"),
+    ("org.gnome.Terminal", "Terminal", None, "gnome-terminal"),
+    ("org.gnome.Nautilus", "Files", "Gestionnaire de fichiers", "nautilus --new-window %U"),
+    ("spotify", "Spotify", None, "spotify %U"),
+    ("vlc", "VLC media player", "Lecteur multimédia VLC", "/usr/bin/vlc --started-from-file %U"),
+    ("libreoffice-writer", "LibreOffice Writer", None, "libreoffice --writer %U"),
+]
+
+
+class RecordingSink:
+    """Collects the side effects commands would have had (thread-safe)."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def record(self, kind, value):
+        with self._lock:
+            self.events.append((kind, value))
+
+    def counts(self):
+        with self._lock:
+            return Counter(kind for kind, _ in self.events)
+
+
+class RecordingAudio:
+    """Stands in for AudioPlayer: records the sentences instead of playing them."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def speak(self, text, block=True):
+        self.sink.record("speech", text)
+        done = threading.Event()
+        done.set()
+        return done
+
+    def interrupt(self):
+        pass
+
+    def stats(self):
+        return {"utterances": 0, "first_sound_ms": 0.0, "avg_first_sound_ms": 0.0}
+
+
+class _TimedIndex:
+    """AppIndex proxy adding the time spent in extract_one to the calling thread's clock."""
+
+    def __init__(self, index, clock):
+        self.index = index
+        self.clock = clock
+
+    def extract_one(self, query):
+        start = time.perf_counter()
+        try:
+            return self.index.extract_one(query)
+        finally:
+            self.clock.match = getattr(self.clock, "match", 0.0) + time.perf_counter() - start
+
+
+class BatchAssistant(Assistant):
+    """Assistant without audio or microphone whose side effects go to a RecordingSink."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._clock = threading.local()
+        super().__init__()
+        self.llm_streaming = False # Stages are timed on the complete intent
+
+    def _init_audio(self):
+        self.use_gtts = False
+        self.engine = None
+        self.audio = RecordingAudio(self.sink)
+
+    def _init_speech(self):
+        self.recognizer = self.stt = self.listener = self.wake_gate = None
+
+    def _init_apps(self):
+        # The fixed app list goes through the .desktop parser and cache like
+        # the real one, in a temporary directory: the user's cache is untouched
+        self._apps_dir = tempfile.TemporaryDirectory(prefix="ia_navigation_batch")
+        directory = self._apps_dir.name
+        for filename, name, name_fr, exec_line in CORPUS_APPS:
+            with open(os.path.join(directory, filename + ".desktop"), "w") as f:
+                f.write(f"[Desktop Entry]\nType=Application\nName={name}\n"
+                        + (f"Name[fr]={name_fr}\n" if name_fr else "") + f"Exec={exec_line}\n")
+        self.app_cache = DesktopAppCache([directory], os.path.join(directory, "desktop_apps.json"))
+        apps = self._load_installed_apps()
+        app_index = AppIndex(apps, usage=self.usage)
+        self.apps = apps
+        # The rules keep the raw index: their lookups belong to the intent stage
+        self.app_index = _TimedIndex(app_index, self._clock)
+        self.intent_rules = RuleIntentClassifier(app_index)
+
+    def _open_usage(self):
+        # In memory: a benchmark run must not reorder the user's apps
+        return UsageStore()
+
+    def _init_llm(self):
+        from llm_handler import LLMHandler
+        # Every command reaches the backend: the cache would hide regressions.
+        # The fixtures' answers must not end up in the user's intent log either
+        self.llm = LLMHandler(use_cache=False, intent_log=False)
+
+    def _init_model(self):
+        # The user's trained model would make the results depend on their intent log
+        self.intent_model = None
+
+    def _init_youtube(self):
+        pass
+
+    def close(self):
+        super().close()
+        self._apps_dir.cleanup()
+
+    def _launch(self, cmd):
+        self.sink.record("launch", cmd)
+
+    def _open_url(self, url):
+        self.sink.record("url", url)
+
+    def _open_youtube(self, query):
+        # No video lookup: the network would dominate the action stage
+        self._open_url(search_url(query))
+
+    def run(self, command):
+        """Runs one command; returns (intent, seconds spent in each stage)."""
+        self._clock.match = 0.0
+        start = time.perf_counter()
+        intent = self.resolve_intent(command)
+        resolved = time.perf_counter()
+        if not self.execute_intent(intent):
+            self._legacy_fallback(command)
+        match = self._clock.match
+        return intent, {"intent": resolved - start, "match": match,
+                        "action": time.perf_counter() - resolved - match}
+
+
+def load_commands(source):
+    if source == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = f.readlines()
+    return [line.strip().lower() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def run_batch(assistant, commands, workers=4, in_flight=8):
+    """Runs commands on workers threads with at most in_flight submitted at once.
+
+    Returns ([(command, intent, stages) or (command, None, error)], elapsed seconds).
+    """
+    slots = threading.BoundedSemaphore(in_flight)
+    results = [None] * len(commands)
+
+    def job(i, command):
+        try:
+            intent, stages = assistant.run(command)
+            results[i] = (command, intent, stages)
+        except Exception as e:
+            results[i] = (command, None, e)
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        for i, command in enumerate(commands):
+            slots.acquire()
+            pool.submit(job, i, command)
+    return results, time.perf_counter() - start
+
+
+def report(results, elapsed, sink):
+    ok = [r for r in results if r[1] is not None]
+    errors = [r for r in results if r[1] is None]
+    print(f"{len(results)} commandes en {elapsed:.3f} s : {len(results) / elapsed:.1f} commandes/s")
+    for stage in STAGES:
+        samples = [stages[stage] * 1000 for _, _, stages in ok]
+        p = percentiles(samples)
+        mean = sum(samples) / len(samples) if samples else 0.0
+        print(f"  {stage:<7} moy {mean:8.3f} ms | p50 {p['p50']:8.3f} | p95 {p['p95']:8.3f} | p99 {p['p99']:8.3f}")
+    sources = Counter(intent.get("source", "llm") for _, intent, _ in ok)
+    actions = Counter(intent.get("action") for _, intent, _ in ok)
+    print(f"  intentions : {dict(sources)} | actions : {dict(actions)}")
+    print(f"  effets enregistrés : {dict(sink.counts())}")
+    for command, _, error in errors:
+        print(f"  ERREUR '{command}': {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exécution en lot des commandes, sans effets de bord.")
+    parser.add_argument("source", nargs="?", default="commands_fr.txt", help="fichier de commandes, ou - pour stdin")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--in-flight", type=int, default=8, help="commandes soumises en même temps au maximum")
+    parser.add_argument("--offline", action="store_true", help="LLM simulé (LLM_BACKEND=stub)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="affiche l'intention de chaque commande")
+    args = parser.parse_args()
+
+    if args.offline:
+        os.environ["LLM_BACKEND"] = "stub"
+    commands = load_commands(args.source)
+    sink = RecordingSink()
+    assistant = BatchAssistant(sink)
+    assistant.startup.wait_all()
+
+    # The assistant's own prints (DEBUG, "IA: ...") would swamp the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, elapsed = run_batch(assistant, commands, args.workers, args.in_flight)
+    if args.verbose:
+        for command, intent, stages in results:
+            if intent is not None:
+                print(f"{command:<45} -> {intent.get('action')} {intent.get('search') or intent.get('target') or ''}")
+    report(results, elapsed, sink)
+    assistant.close()
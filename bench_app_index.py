@@ -0,0 +1,58 @@
+import random
+import string
+import time
+from thefuzz import process
+from app_index import AppIndex
+
+WORDS = ["editeur", "navigateur", "terminal", "musique", "video", "photo", "code", "studio",
+         "office", "texte", "lecteur", "gestionnaire", "fichiers", "calcul", "web", "mail"]
+
+
+def synthetic_aliases(count, rng):
+    aliases = set()
+    while len(aliases) < count:
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        suffix = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6)))
+        aliases.add(" ".join(words + [suffix]))
+    return sorted(aliases)
+
+
+def typo(text, rng):
+    chars = list(text)
+    pos = rng.randrange(len(chars))
+    chars[pos] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def run(count, queries=200, seed=42):
+    rng = random.Random(seed)
+    aliases = synthetic_aliases(count, rng)
+    apps = {alias: alias.split()[-1] for alias in aliases}
+    samples = [typo(rng.choice(aliases), rng) for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = AppIndex(apps)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    baseline = [process.extractOne(q, list(apps.keys())) for q in samples]
+    baseline_ms = (time.perf_counter() - start) * 1000 / queries
+
+    start = time.perf_counter()
+    indexed = [index.extract_one(q) for q in samples]
+    indexed_ms = (time.perf_counter() - start) * 1000 / queries
+
+    same_match = sum(1 for a, b in zip(baseline, indexed) if a[0] == b[0])
+    # Decision agreement for the thresholds used by Assistant
+    same_decision = sum(
+        1 for a, b in zip(baseline, indexed)
+        if all((a[1] > t) == (b[1] > t) for t in (50, 60, 70))
+    )
+    print(f"{count:>6} alias | build {build_ms:7.1f} ms | extractOne {baseline_ms:7.2f} ms/req "
+          f"| AppIndex {indexed_ms:6.2f} ms/req | x{baseline_ms / indexed_ms:5.1f} "
+          f"| même résultat {same_match}/{queries} | même seuil {same_decision}/{queries}")
+
+
+if __name__ == "__main__":
+    for count in (1000, 2500, 5000, 10000):
+        run(count)
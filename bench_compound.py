@@ -0,0 +1,74 @@
+import io
+import os
+import json
+import time
+import contextlib
+from batch import BatchAssistant, RecordingSink
+
+# Compound command in one utterance vs the same commands spoken one by one.
+# Simulated costs: STT_LATENCY per utterance (recognition pass), LLM_LATENCY
+# per API round trip and ACTION_LATENCY per launch / opened URL. Speech is
+# recorded, not played. "LLM" forces every command through the API, "local"
+# lets the rule classifier split and resolve the compound command.
+
+STT_LATENCY = 0.4
+LLM_LATENCY = 0.35
+ACTION_LATENCY = 0.15
+
+CASES = [
+    ("ouvre firefox et cherche la météo à paris", ["ouvre firefox", "cherche la météo à paris"]),
+    ("ouvre le terminal, lance la calculatrice et joue daft punk",
+     ["ouvre le terminal", "lance la calculatrice", "joue daft punk"]),
+    ("cherche recette de crêpes puis ouvre l'éditeur", ["cherche recette de crêpes", "ouvre l'éditeur"]),
+]
+
+
+class SlowActionsAssistant(BatchAssistant):
+    def _launch(self, cmd):
+        time.sleep(ACTION_LATENCY)
+        super()._launch(cmd)
+
+    def _open_url(self, url):
+        time.sleep(ACTION_LATENCY)
+        super()._open_url(url)
+
+
+def utterance(assistant, command):
+    time.sleep(STT_LATENCY)
+    assistant.process_command(command)
+
+
+def measure(assistant, utterances):
+    start = time.perf_counter()
+    for command in utterances:
+        utterance(assistant, command)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    os.environ["LLM_BACKEND"] = "stub"
+    os.environ["LLM_STUB_LATENCY"] = str(LLM_LATENCY)
+    assistant = SlowActionsAssistant(RecordingSink())
+    assistant.startup.wait_all()
+    # The stub answers what the LLM would: the rule classifier's reading of each sentence
+    answers = {}
+    for compound, parts in CASES:
+        for text in [compound] + parts:
+            answers[text] = json.dumps(assistant.intent_rules.classify(text))
+    assistant.llm.backend.backend.answers = answers
+
+    print(f"STT {STT_LATENCY * 1000:.0f} ms/phrase, LLM {LLM_LATENCY * 1000:.0f} ms/appel, "
+          f"action {ACTION_LATENCY * 1000:.0f} ms")
+    for compound, parts in CASES:
+        results = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            assistant.intent_rules.threshold = 2.0 # Never local: every command costs an API call
+            results["une par une (LLM)"] = measure(assistant, parts)
+            results["composée (LLM)"] = measure(assistant, [compound])
+            assistant.intent_rules.threshold = 0.8
+            results["composée (local)"] = measure(assistant, [compound])
+        baseline = results["une par une (LLM)"]
+        print(f"\n{compound}")
+        for label, elapsed in results.items():
+            print(f"  {label:<20} {elapsed * 1000:7.0f} ms  (x{baseline / elapsed:.1f})")
+    assistant.close()
@@ -0,0 +1,38 @@
+import os
+import json
+from intent_stream import FakeStreamSource
+
+os.environ["INTENT_CACHE_DISABLE"] = "1"
+os.environ["INTENT_LOG"] = "0"
+
+from llm_handler import LLMHandler
+
+# Canned LLM answers, streamed a few characters at a time like real tokens
+ANSWERS = {
+    "ouvre firefox": {"action": "open", "target": "firefox", "search": None, "platform": None, "confidence": 1.0},
+    "cherche des chats sur google": {"action": "search", "target": "google", "search": "chats", "platform": "google", "confidence": 1.0},
+    "joue adriano": {"action": "play", "target": "youtube", "search": "Adriano", "platform": "youtube", "confidence": 1.0},
+    "au revoir": {"action": "quit", "target": None, "search": None, "platform": None, "confidence": 1.0},
+}
+
+
+class FakeStreamingBackend:
+    name = "fake"
+
+    def __init__(self, chunk_size=3, delay=0.02):
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    def stream(self, messages, temperature=0.1, max_tokens=200):
+        answer = ANSWERS[messages[-1]["content"]]
+        return iter(FakeStreamSource(json.dumps(answer, indent=2), self.chunk_size, self.delay))
+
+
+llm = LLMHandler()
+llm.backend = FakeStreamingBackend()
+
+for command in ANSWERS:
+    llm.predict_intent_stream(command, on_ready=lambda intent: None)
+    timings = llm.last_stream_timings
+    print(f"{command:<32} première action {timings['first_action'] * 1000:6.0f} ms "
+          f"| réponse complète {timings['full'] * 1000:6.0f} ms")
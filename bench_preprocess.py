@@ -0,0 +1,107 @@
+import sys
+import time
+import numpy as np
+import speech_recognition as sr
+from audio_preprocess import AudioPreprocessor, NoSpeech
+from bench_stt import load_fixtures
+from make_fixtures import STT_DIR
+from recognizers import create_backend, word_error_rate
+
+# Usage: python bench_preprocess.py [dossier] [google,vosk]
+# Compares what the recognizers receive with and without pre-processing
+# (trimmed silence, 16 kHz mono, normalized gain): bytes sent (FLAC, as
+# uploaded to Google), processing time and recognition latency per backend.
+# The folder holds "xxx.wav" clips with their transcript in "xxx.txt" (default:
+# fixtures/stt, see make_fixtures.py); when it has none, synthetic captures
+# (44.1 kHz, quiet "speech" between long silences) only measure the sizes and
+# the processing time.
+
+
+def synthetic_fixtures(count=5, rate=44100, seed=3):
+    rng = np.random.default_rng(seed)
+    fixtures = []
+    for i in range(count):
+        lead, speech, tail = rng.uniform(0.5, 1.5), rng.uniform(1.0, 2.5), rng.uniform(0.8, 1.5)
+        t = np.arange(int(speech * rate)) / rate
+        # Voiced sound: harmonics of a gliding pitch with a syllable-rate envelope
+        pitch = 120 + 40 * np.sin(2 * np.pi * 0.7 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / rate
+        voice = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        signal = np.concatenate([np.zeros(int(lead * rate)), 0.03 * voice, np.zeros(int(tail * rate))])
+        signal += rng.normal(0, 0.0005, len(signal)) # Room noise
+        pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+        fixtures.append((f"synthétique_{i + 1}", sr.AudioData(pcm, rate, 2), len(signal) / rate, None))
+    return fixtures
+
+
+def flac_size(audio):
+    # What recognize_google uploads: FLAC at the capture's own rate
+    return len(audio.get_flac_data(convert_rate=None if audio.sample_rate >= 8000 else 8000, convert_width=2))
+
+
+def recognize(backend, audio):
+    start = time.perf_counter()
+    try:
+        text = backend.recognize(audio)
+    except sr.UnknownValueError:
+        text = ""
+    except Exception as e:
+        print(f"    {backend.name}: erreur {e}")
+        text = ""
+    return text, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else STT_DIR
+    fixtures = load_fixtures(directory)
+    if not fixtures:
+        if directory != STT_DIR:
+            print(f"Aucun couple .wav/.txt trouvé dans {directory}.")
+            sys.exit(1)
+        print("Pas de clips dans fixtures/stt (python make_fixtures.py) : captures synthétiques.")
+        directory = None
+        fixtures = synthetic_fixtures()
+    backends = []
+    if directory:
+        names = sys.argv[2].split(",") if len(sys.argv) > 2 else ["vosk", "google"]
+        for name in names:
+            try:
+                backends.append(create_backend(name, sr.Recognizer()))
+            except Exception as e:
+                print(f"{name}: indisponible ({e})")
+
+    preprocessor = AudioPreprocessor()
+    totals = {"before": 0, "after": 0, "audio": 0.0, "process": 0.0}
+    latency = {backend.name: [0.0, 0.0] for backend in backends}
+    for name, audio, duration, reference in fixtures:
+        start = time.perf_counter()
+        try:
+            cleaned = preprocessor.process(audio)
+        except NoSpeech:
+            cleaned = None
+        elapsed = time.perf_counter() - start
+        before = flac_size(audio)
+        after = flac_size(cleaned) if cleaned else 0
+        kept = len(cleaned.frame_data) / 2 / cleaned.sample_rate if cleaned else 0.0
+        totals["before"] += before
+        totals["after"] += after
+        totals["audio"] += duration
+        totals["process"] += elapsed
+        print(f"  {name:<24} {duration:4.1f} s -> {kept:4.1f} s | FLAC {before / 1024:6.1f} -> {after / 1024:5.1f} Ko "
+              f"| prétraitement {elapsed * 1000:5.1f} ms")
+        for backend in backends:
+            text_before, time_before = recognize(backend, audio)
+            text_after, time_after = recognize(backend, cleaned) if cleaned else ("", 0.0)
+            latency[backend.name][0] += time_before
+            latency[backend.name][1] += time_after
+            wer = ""
+            if reference is not None:
+                wer = (f" | WER {word_error_rate(reference, text_before):.0%} -> "
+                       f"{word_error_rate(reference, text_after):.0%}")
+            print(f"    {backend.name:<8} {time_before * 1000:6.0f} -> {time_after * 1000:6.0f} ms{wer}")
+
+    print(f"{len(fixtures)} clips, {totals['audio']:.1f} s d'audio : FLAC {totals['before'] / 1024:.0f} -> "
+          f"{totals['after'] / 1024:.0f} Ko ({totals['after'] / totals['before']:.0%}), prétraitement "
+          f"{totals['process'] * 1000 / len(fixtures):.1f} ms/clip (RTF {totals['process'] / totals['audio']:.4f})")
+    for backend_name, (before, after) in latency.items():
+        print(f"{backend_name}: reconnaissance {before * 1000 / len(fixtures):.0f} -> {after * 1000 / len(fixtures):.0f} ms/clip")
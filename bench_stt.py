@@ -0,0 +1,70 @@
+import os
+import sys
+import glob
+import time
+import wave
+import speech_recognition as sr
+from recognizers import create_backend, word_error_rate
+from make_fixtures import STT_DIR
+
+# Usage: python bench_stt.py [dossier] [vosk,google]
+# The folder holds French clips "xxx.wav" with their reference transcript in "xxx.txt"
+# (default: fixtures/stt, clips synthesized by make_fixtures.py).
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(txt_path):
+            continue
+        with open(txt_path, "r") as f:
+            reference = f.read().strip()
+        with wave.open(wav_path, "rb") as w:
+            duration = w.getnframes() / w.getframerate()
+        with sr.AudioFile(wav_path) as source:
+            audio = sr.Recognizer().record(source)
+        fixtures.append((os.path.basename(wav_path), audio, duration, reference))
+    return fixtures
+
+
+def run(backend, fixtures):
+    total_audio = total_time = total_wer = 0.0
+    failures = 0
+    for name, audio, duration, reference in fixtures:
+        start = time.perf_counter()
+        try:
+            hypothesis = backend.recognize(audio)
+        except sr.UnknownValueError:
+            hypothesis = ""
+        except Exception as e:
+            print(f"  {name}: erreur {e}")
+            hypothesis = ""
+            failures += 1
+        elapsed = time.perf_counter() - start
+        wer = word_error_rate(reference, hypothesis)
+        total_audio += duration
+        total_time += elapsed
+        total_wer += wer
+        print(f"  {name:<30} RTF {elapsed / duration:5.2f} | WER {wer:5.1%} | {hypothesis!r}")
+    count = len(fixtures)
+    print(f"{backend.name}: RTF {total_time / total_audio:.2f} | WER moyen {total_wer / count:.1%} "
+          f"| {count} clips, {failures} erreurs")
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else STT_DIR
+    fixtures = load_fixtures(directory)
+    if not fixtures:
+        print(f"Aucun couple .wav/.txt trouvé dans {directory}"
+              + (" : lancez python make_fixtures.py." if directory == STT_DIR else "."))
+        sys.exit(1)
+    names = sys.argv[2].split(",") if len(sys.argv) > 2 else ["vosk", "google"]
+    recognizer = sr.Recognizer()
+    for name in names:
+        try:
+            backend = create_backend(name, recognizer)
+        except Exception as e:
+            print(f"{name}: indisponible ({e})")
+            continue
+        run(backend, fixtures)
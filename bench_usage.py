@@ -0,0 +1,73 @@
+import random
+import time
+from app_index import AppIndex
+from bench_app_index import synthetic_aliases, typo
+from launcher import Launcher
+from usage import UsageStore
+
+# Usage: python bench_usage.py
+# A few days of "ouvre ..." commands where a handful of apps make most of the
+# launches (Zipf-like), spoken with the same few phrasings. Compares app
+# resolution without and with the usage store, and program lookup with and
+# without pre-warming of the most used apps.
+
+DAYS = 5
+PER_DAY = 60
+FAVOURITES = 8
+
+
+def simulate(count=2500, seed=7):
+    rng = random.Random(seed)
+    aliases = synthetic_aliases(count, rng)
+    favourites = rng.sample(aliases, FAVOURITES)
+    # Each favourite is asked for with two or three habitual (misspelled) phrasings
+    phrasings = {alias: [typo(alias, rng) for _ in range(rng.randint(2, 3))] for alias in favourites}
+    weights = [1 / (rank + 1) for rank in range(FAVOURITES)]
+
+    clock = [0.0]
+    usage = UsageStore(clock=lambda: clock[0])
+    plain = AppIndex(aliases)
+    learned = AppIndex(aliases, usage=usage)
+    same = total = 0
+    plain_time = 0.0
+    for day in range(DAYS):
+        for i in range(PER_DAY):
+            clock[0] = day * 86400 + i * 600
+            alias = rng.choices(favourites, weights)[0]
+            query = rng.choice(phrasings[alias])
+            start = time.perf_counter()
+            expected = plain.extract_one(query)
+            plain_time += time.perf_counter() - start
+            result = learned.extract_one(query)
+            same += result == expected
+            total += 1
+            usage.record(result[0], query, result[1])
+    return usage.stats(), plain_time / total * 1000, same, total
+
+
+def prewarm_gain(programs=("true", "env", "sh"), rounds=30):
+    """Launch-to-spawn (ms) of short-lived programs without and with pre-warming."""
+    cold = Launcher(reuse=False)
+    warm = Launcher(reuse=False)
+    warm.prewarm(programs)
+    for _ in range(rounds):
+        for program in programs:
+            cold.launch([program])
+            warm.launch([program])
+    spawn = [sum(sum(l) for l in launcher.latencies.values()) / (rounds * len(programs)) * 1000
+             for launcher in (cold, warm)]
+    lookup = [launcher._lookups[kind][1] / launcher._lookups[kind][0] * 1e6
+              for launcher, kind in ((cold, "cold"), (warm, "prewarmed"))]
+    return spawn, lookup, warm.stats()["prewarmed_hits"]
+
+
+if __name__ == "__main__":
+    stats, plain_ms, same, total = simulate()
+    print(f"{DAYS} jours, {total} lancements, {FAVOURITES} applications habituelles parmi 2500")
+    print(f"  résolution sans usage : {plain_ms:.2f} ms/requête")
+    print(f"  sorties anticipées : {stats['early_exits']}/{stats['lookups']} ({stats['hit_rate']:.0%}), "
+          f"{stats['resolution_saved_ms']:.0f} ms gagnées au total, même résultat {same}/{total}")
+    print(f"  départages par l'usage : {stats['tie_breaks']} | top : {', '.join(stats['top'][:3])}")
+    spawn, lookup, hits = prewarm_gain()
+    print(f"  lancement (programme déjà en cache disque) : {spawn[0]:.2f} ms -> {spawn[1]:.2f} ms préchargé "
+          f"(recherche du programme {lookup[0]:.0f} µs -> {lookup[1]:.1f} µs, {hits} lancements préchargés)")
@@ -0,0 +1,63 @@
+import os
+import sys
+import glob
+import time
+import wave
+import speech_recognition as sr
+from recognizers import create_recognizer
+from wake_word import create_spotter
+from make_fixtures import WAKE_WORD_DIR
+
+# Usage: python bench_wake_word.py [dossier] [mot1,mot2]
+# The folder holds "positive/*.wav" (wake word spoken) and "negative/*.wav"
+# (background chatter, TV, other speech); default: fixtures/wake_word, clips
+# synthesized by make_fixtures.py. Reports false accepts, false rejects and
+# the CPU time the spotter needs per hour of audio.
+
+
+def load(directory):
+    clips = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with wave.open(wav_path, "rb") as w:
+            duration = w.getnframes() / w.getframerate()
+        with sr.AudioFile(wav_path) as source:
+            clips.append((os.path.basename(wav_path), sr.Recognizer().record(source), duration))
+    return clips
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else WAKE_WORD_DIR
+    wake_words = sys.argv[2].split(",") if len(sys.argv) > 2 else os.getenv("WAKE_WORDS", "assistant").split(",")
+    spotter = create_spotter(create_recognizer(sr.Recognizer()), wake_words)
+    if spotter is None:
+        print("Aucun modèle Vosk local : réglez STT_BACKENDS=vosk et VOSK_MODEL_PATH.")
+        sys.exit(1)
+    positives = load(os.path.join(directory, "positive"))
+    negatives = load(os.path.join(directory, "negative"))
+    if not positives and not negatives:
+        print(f"Aucun clip .wav trouvé dans {directory}"
+              + (" : lancez python make_fixtures.py." if directory == WAKE_WORD_DIR else "."))
+        sys.exit(1)
+
+    cpu = 0.0
+    audio_seconds = 0.0
+    false_rejects = []
+    false_accepts = []
+    for clips, expected, errors in ((positives, True, false_rejects), (negatives, False, false_accepts)):
+        for name, audio, duration in clips:
+            start = time.process_time()
+            detected = spotter.detect(audio)
+            cpu += time.process_time() - start
+            audio_seconds += duration
+            if detected != expected:
+                errors.append(name)
+
+    print(f"Spotter : {spotter.name} | mots : {', '.join(wake_words)}")
+    if positives:
+        print(f"Faux rejets : {len(false_rejects)}/{len(positives)} ({len(false_rejects) / len(positives):.1%}) {false_rejects}")
+    if negatives:
+        hours = sum(d for _, _, d in negatives) / 3600
+        print(f"Faux déclenchements : {len(false_accepts)}/{len(negatives)} "
+              f"({len(false_accepts) / hours:.1f} par heure de bruit) {false_accepts}")
+    if audio_seconds:
+        print(f"CPU : {cpu / audio_seconds * 3600:.1f} s par heure d'audio")
@@ -0,0 +1,32 @@
+import random
+import time
+from tracing import percentiles
+from youtube_resolver import YouTubeResolver, StubExtractor
+
+# Play-path latency with a stubbed extractor: lookups take 0.2-3 s, queries
+# repeat like real usage, and the budget caps how long "joue ..." can block.
+
+QUERIES = ["adriano", "daft punk", "jazz relaxant", "stromae", "podcast python", "lofi", "aya nakamura"]
+
+
+class JitterExtractor(StubExtractor):
+    def __call__(self, query):
+        self.latency = random.uniform(0.2, 3.0)
+        return super().__call__(query)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for budget in (None, 1.5, 0.5):
+        resolver = YouTubeResolver(extractor=JitterExtractor(), budget=budget or 60)
+        cold = []
+        for _ in range(40):
+            query = random.choice(QUERIES)
+            start = time.perf_counter()
+            resolver.resolve(query)
+            cold.append(time.perf_counter() - start)
+        stats = resolver.stats()
+        label = f"budget {budget}s" if budget else "sans budget"
+        p = percentiles(cold)
+        print(f"{label:<14} p50 {p['p50'] * 1000:6.0f} ms | p95 {p['p95'] * 1000:6.0f} ms | p99 {p['p99'] * 1000:6.0f} ms "
+              f"| cache {stats['cache_hits']}/{stats['requests']} | page de résultats {stats['budget_fallbacks']}")
@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import socket
+import itertools
+import subprocess
+from paths import cache_dir
+from daemon import socket_path
+
+# Usage:
+#   python client.py "ouvre firefox"   one-shot command (starts the daemon if needed)
+#   python client.py --stop            stops the daemon
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class AssistantClient:
+    """One connection to the daemon; requests on it are sequential."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, path=None, timeout=None):
+        self.path = path or socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(self.path)
+        except OSError as e:
+            self.sock.close()
+            raise DaemonUnavailable(f"Démon injoignable ({self.path}): {e}")
+        self.sock.settimeout(timeout)
+        self._reader = self.sock.makefile("rb")
+
+    def request(self, op, on_message=None, **fields):
+        """Sends one request and returns its "done" reply; messages go to on_message(text)."""
+        request_id = next(self._ids)
+        self.sock.sendall((json.dumps({"id": request_id, "op": op, **fields}, ensure_ascii=False) + "\n").encode("utf-8"))
+        for line in self._reader:
+            reply = json.loads(line)
+            if reply.get("id") != request_id:
+                continue
+            if reply.get("event") == "message":
+                if on_message:
+                    on_message(reply["text"])
+                continue
+            if not reply.get("ok"):
+                raise RuntimeError(reply.get("error", "erreur du démon"))
+            return reply
+        raise DaemonUnavailable("Connexion fermée par le démon")
+
+    def close(self):
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def start_daemon(path=None, timeout=15):
+    """Starts daemon.py in the background and waits until it answers."""
+    log = open(os.path.join(cache_dir(), "daemon.log"), "ab")
+    subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "daemon.py")],
+        stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+    )
+    log.close()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with AssistantClient(path) as client:
+                client.request("ping")
+                return
+        except DaemonUnavailable:
+            time.sleep(0.05)
+    raise DaemonUnavailable("Le démon n'a pas démarré à temps")
+
+
+class RemoteAssistant:
+    """Thin client with the Assistant methods the console and the GUI use.
+
+    Every call opens its own connection (a few µs on a Unix socket), so the
+    GUI can listen, run a command and interrupt from different threads.
+    """
+
+    def __init__(self, output_callback=None, path=None):
+        self.output_callback = output_callback
+        self.path = path or socket_path()
+        self.running = True
+        with AssistantClient(self.path) as client:
+            client.request("ping")
+
+    def _request(self, op, **fields):
+        with AssistantClient(self.path) as client:
+            return client.request(op, on_message=self._notify, **fields)
+
+    def _notify(self, message):
+        print(message)
+        if self.output_callback:
+            self.output_callback(message)
+
+    def speak(self, text):
+        self._request("speak", text=text)
+
+    def process_command(self, command):
+        if not command:
+            return
+        if self._request("command", text=command)["quit"]:
+            self.running = False
+
+    def listen(self):
+        text = self._request("listen")["text"]
+        if text is None:
+            # No voice input on the daemon side: read it here
+            try:
+                return input("Vous (Texte): ").strip().lower()
+            except EOFError:
+                return "quitter"
+        return text
+
+    def interrupt_speech(self):
+        self._request("interrupt")
+
+    def stats(self):
+        return self._request("stats")["stats"]
+
+    def latency_report(self):
+        return self._request("latency")["report"]
+
+    def close(self):
+        pass
+
+
+def open_assistant(output_callback=None):
+    """Assistant for the console/GUI depending on ASSISTANT_DAEMON.
+
+    "auto" (default) uses the daemon if it is running, "1" starts it if
+    needed, "0" always builds a local Assistant.
+    """
+    mode = os.getenv("ASSISTANT_DAEMON", "auto")
+    if mode != "0":
+        try:
+            if mode == "1":
+                try:
+                    return RemoteAssistant(output_callback)
+                except DaemonUnavailable:
+                    start_daemon()
+            return RemoteAssistant(output_callback)
+        except DaemonUnavailable:
+            if mode == "1":
+                raise
+    from assistant import Assistant
+    return Assistant(output_callback=output_callback)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('Usage: python client.py "ouvre firefox" | --stop')
+        sys.exit(1)
+    if sys.argv[1] == "--stop":
+        try:
+            with AssistantClient() as client:
+                client.request("shutdown")
+        except DaemonUnavailable as e:
+            print(e)
+        sys.exit(0)
+
+    try:
+        client = AssistantClient()
+    except DaemonUnavailable:
+        start_daemon()
+        client = AssistantClient()
+    with client:
+        client.request("command", on_message=print, text=" ".join(sys.argv[1:]))
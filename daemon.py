@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+from paths import runtime_dir
+
+# Protocol: one JSON object per line in each direction.
+#   -> {"id": 1, "op": "command", "text": "ouvre firefox"}
+#   <- {"id": 1, "event": "message", "text": "IA: Ouverture de firefox..."}
+#   <- {"id": 1, "event": "done", "ok": true, "quit": false, "ms": 4.2}
+# ops: ping, command, speak, listen, interrupt, stats, latency, shutdown
+
+
+def socket_path():
+    return os.path.expanduser(os.getenv("ASSISTANT_SOCKET", "")) or os.path.join(runtime_dir(), "ia_navigation.sock")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _ClientHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        write_lock = threading.Lock()
+
+        def send(obj):
+            data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+            with write_lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                send({"event": "done", "ok": False, "error": "JSON invalide"})
+                continue
+            request_id = request.get("id")
+            try:
+                response = self.server.owner.handle(request, lambda obj: send({"id": request_id, **obj}))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            send({"id": request_id, "event": "done", **response})
+
+
+class AssistantDaemon:
+    """Keeps one warm Assistant and serves it over a Unix-domain socket.
+
+    Clients connect concurrently; commands run one at a time on the shared
+    Assistant, and the messages it prints while running a command are sent
+    back to the client that asked for it.
+    """
+
+    def __init__(self, assistant=None, path=None):
+        if assistant is None:
+            from assistant import Assistant
+            assistant = Assistant()
+        self.path = path or socket_path()
+        self.assistant = assistant
+        self.assistant.output_callback = self._on_output
+        # Replies are spoken in the background: the client gets its answer once
+        # the action is dispatched, not after the sentence has been played
+        self.assistant.speak_blocking = False
+        self.assistant.text_fallback = False
+        self._command_lock = threading.Lock()
+        self._listen_lock = threading.Lock()
+        self._current = None # send() of the client whose command is running
+        self._server = None
+        self.requests = 0
+
+    def _on_output(self, message):
+        send = self._current
+        if send:
+            try:
+                send({"event": "message", "text": message})
+            except OSError:
+                pass # The client went away, the command still completes
+
+    def handle(self, request, send):
+        """Runs one request; send(obj) streams intermediate events to the client."""
+        self.requests += 1
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op in ("command", "speak"):
+            text = request.get("text", "")
+            start = time.perf_counter()
+            with self._command_lock:
+                self._current = send
+                try:
+                    if op == "speak":
+                        self.assistant.speak(text)
+                    else:
+                        self.assistant.process_command(text.lower())
+                    quit = not self.assistant.running
+                    # "quitter" ends the client session, not the daemon
+                    self.assistant.running = True
+                finally:
+                    self._current = None
+            return {"ok": True, "quit": quit, "ms": (time.perf_counter() - start) * 1000}
+        if op == "listen":
+            # One microphone: concurrent listen requests take turns
+            with self._listen_lock:
+                return {"ok": True, "text": self.assistant.listen()}
+        if op == "interrupt":
+            self.assistant.interrupt_speech()
+            return {"ok": True}
+        if op == "latency":
+            return {"ok": True, "report": self.assistant.latency_report()}
+        if op == "stats":
+            return {"ok": True, "stats": self.assistant.stats(), "requests": self.requests}
+        if op == "shutdown":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Opération inconnue : {op}"}
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path) # Left behind by a daemon that died
+        else:
+            raise RuntimeError(f"Un démon écoute déjà sur {self.path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        self._remove_stale_socket()
+        self._server = _Server(self.path, _ClientHandler)
+        self._server.owner = self
+        os.chmod(self.path, 0o600)
+        print(f"Démon prêt sur {self.path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.assistant.close()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+if __name__ == "__main__":
+    daemon = AssistantDaemon()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import glob
+import time
+import shlex
+from paths import cache_dir
+
+CACHE_VERSION = 2 # 2: "exec" is the full argv
+
+DEFAULT_SEARCH_PATHS = [
+    "/usr/share/applications",
+    os.path.expanduser("~/.local/share/applications")
+]
+
+
+# Field codes standing for files/URLs to open (or deprecated): dropped, the
+# assistant never passes any
+_DROPPED_FIELD_CODES = set("fFuUdDnNvm")
+_FIELD_CODE_RE = re.compile(r"%(.)")
+_STRING_ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+
+
+def parse_exec(exec_line, name=None, icon=None, desktop_path=None):
+    """Exec= value -> argv list with the field codes resolved, or None if malformed.
+
+    Follows the Desktop Entry spec: string escapes (\\s, \\\\...) are undone,
+    then the line is split with its double-quote rules. %i becomes
+    "--icon <Icon>", %c the name, %k the .desktop path, %% a literal %.
+    """
+    unescaped = re.sub(r"\\([sntr\\])", lambda m: _STRING_ESCAPES[m.group(1)], exec_line)
+    try:
+        words = shlex.split(unescaped)
+    except ValueError:
+        return None
+
+    def field(match):
+        code = match.group(1)
+        if code == "%":
+            return "%"
+        if code == "c":
+            return name or ""
+        if code == "k":
+            return desktop_path or ""
+        return "" # %i inside a word, %f, %U... and unknown codes
+
+    argv = []
+    for word in words:
+        if word == "%i":
+            if icon:
+                argv += ["--icon", icon]
+        elif len(word) == 2 and word[0] == "%" and word[1] in _DROPPED_FIELD_CODES:
+            continue
+        else:
+            argv.append(_FIELD_CODE_RE.sub(field, word))
+    return argv or None
+
+
+def parse_desktop_file(filepath):
+    """Parses a .desktop file. Returns {"exec", "aliases"} or None if not launchable.
+
+    "exec" is the full argv (see parse_exec). Only the [Desktop Entry] group
+    is read: the Exec lines of [Desktop Action ...] groups are other commands.
+    """
+    with open(filepath, "r", errors="ignore") as f:
+        content = f.read()
+
+    keys = {}
+    group = None
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            group = line
+        elif group == "[Desktop Entry]" and "=" in line:
+            key, value = line.split("=", 1)
+            keys.setdefault(key.strip(), value.strip())
+
+    name = keys.get("Name")
+    name_fr = keys.get("Name[fr]")
+    if "Exec" not in keys or keys.get("NoDisplay") == "true" or keys.get("Hidden") == "true":
+        return None
+
+    argv = parse_exec(keys["Exec"], name_fr or name, keys.get("Icon"), filepath)
+    if not argv:
+        return None
+
+    # Use filename as a fallback/alias (e.g. windsurf.desktop -> windsurf)
+    aliases = [os.path.splitext(os.path.basename(filepath))[0].lower()]
+    if name:
+        aliases.append(name.lower())
+    if name_fr:
+        aliases.append(name_fr.lower())
+    return {"exec": argv, "aliases": aliases}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DesktopAppCache:
+    """On-disk index of parsed .desktop entries, validated by directory and file mtimes.
+
+    A warm load only re-parses files that were added or modified since the last
+    run; removed files are dropped. The directory listing itself is only redone
+    when the directory mtime changed.
+    """
+
+    def __init__(self, search_paths=None, cache_path=None):
+        self.search_paths = search_paths if search_paths is not None else DEFAULT_SEARCH_PATHS
+        self.cache_path = cache_path or os.path.join(cache_dir(), "desktop_apps.json")
+        # Stats of the last load(), e.g. for startup timing
+        self.stats = {}
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data.get("dirs", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _write_cache(self, dirs):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": CACHE_VERSION, "dirs": dirs}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Erreur écriture cache applications: {e}")
+
+    def load(self, force_rebuild=False):
+        """Returns the apps dict {alias: argv}, using the on-disk cache when valid."""
+        start = time.perf_counter()
+        cached_dirs = {} if force_rebuild else self._read_cache()
+        dirs = {}
+        parsed = 0
+        reused = 0
+        changed = force_rebuild or set(cached_dirs) != set(
+            p for p in self.search_paths if os.path.exists(p))
+
+        for path in self.search_paths:
+            dir_mtime = _mtime(path)
+            if dir_mtime is None:
+                continue
+
+            cached = cached_dirs.get(path, {})
+            cached_files = cached.get("files", {})
+            if cached and cached.get("mtime") == dir_mtime:
+                # No entry added or removed: reuse the cached listing
+                filepaths = list(cached_files)
+            else:
+                filepaths = sorted(glob.glob(os.path.join(path, "*.desktop")))
+                changed = True
+
+            files = {}
+            for filepath in filepaths:
+                file_mtime = _mtime(filepath)
+                if file_mtime is None:
+                    changed = True
+                    continue
+                previous = cached_files.get(filepath)
+                if previous and previous.get("mtime") == file_mtime:
+                    files[filepath] = previous
+                    reused += 1
+                    continue
+                try:
+                    entry = parse_desktop_file(filepath)
+                except Exception:
+                    entry = None
+                files[filepath] = {"mtime": file_mtime, "entry": entry}
+                parsed += 1
+                changed = True
+
+            dirs[path] = {"mtime": dir_mtime, "files": files}
+
+        if changed:
+            self._write_cache(dirs)
+
+        apps = {}
+        for path in self.search_paths:
+            for item in dirs.get(path, {}).get("files", {}).values():
+                entry = item.get("entry")
+                if entry:
+                    for alias in entry["aliases"]:
+                        apps[alias] = entry["exec"]
+
+        self.stats = {
+            "mode": "cold" if reused == 0 else "warm",
+            "parsed": parsed,
+            "reused": reused,
+            "entries": len(apps),
+            "load_ms": (time.perf_counter() - start) * 1000,
+        }
+        return apps
+
+    def rebuild(self):
+        """Ignores the on-disk cache and re-parses every .desktop file."""
+        return self.load(force_rebuild=True)
+
+
+if __name__ == "__main__":
+    cache = DesktopAppCache()
+    cache.rebuild()
+    print(f"Démarrage à froid : {cache.stats}")
+    cache.load()
+    print(f"Démarrage à chaud : {cache.stats}")
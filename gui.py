@@ -1,6 +1,10 @@
 import customtkinter as ctk
 import threading
-from assistant import Assistant
+from client import open_assistant
+from gui_bridge import UiMessageQueue, CommandWorker
+
+MAX_TRANSCRIPT_LINES = 500 # Older chat lines are dropped beyond this
+DRAIN_INTERVAL_MS = 50
 
 # Set theme
 ctk.set_appearance_mode("Dark")
@@ -49,21 +53,64 @@ class AssistantGUI(ctk.CTk):
         )
         self.listen_button.grid(row=2, column=0, padx=20, pady=(5, 20), sticky="ew")
 
-        # Assistant Instance
-        self.assistant = Assistant(output_callback=self.update_chat)
+        # Worker threads never touch widgets: they post to this queue, drained by the Tk loop
+        self.messages = UiMessageQueue()
+
+        # Assistant Instance (thin client of the daemon when it runs)
+        self.assistant = open_assistant(output_callback=self.update_chat)
         self.is_listening = False
+        # A single worker owns the Assistant, commands wait in a bounded queue
+        self.worker = CommandWorker(self._process_text, max_pending=3, on_dropped=self._on_command_dropped)
+        # Escape cancels the waiting commands and the current answer
+        self.bind("<Escape>", lambda e: self.cancel_commands())
+        # Ctrl+L shows the latency percentiles of the traced stages (TRACE=1)
+        self.bind("<Control-l>", lambda e: self.update_chat(self.assistant.latency_report()))
+        self.after(DRAIN_INTERVAL_MS, self._drain_messages)
 
     def update_chat(self, message):
-        """Updates the text box safely."""
-        self.chat_display.configure(state="normal")
-        self.chat_display.insert("end", message + "\n\n")
-        self.chat_display.see("end")
-        self.chat_display.configure(state="disabled")
+        """Queues a chat message; safe to call from any thread."""
+        self.messages.post(message)
+
+    def _drain_messages(self):
+        """Applies queued messages in one batch, on the Tk thread."""
+        lines = []
+        for item in self.messages.drain():
+            if callable(item):
+                item()
+            else:
+                lines.append(item + "\n\n")
+        if lines:
+            self.chat_display.configure(state="normal")
+            self.chat_display.insert("end", "".join(lines))
+            # Cap the transcript so the textbox doesn't grow without bound
+            excess = int(self.chat_display.index("end-1c").split(".")[0]) - MAX_TRANSCRIPT_LINES
+            if excess > 0:
+                self.chat_display.delete("1.0", f"{excess + 1}.0")
+            self.chat_display.see("end")
+            self.chat_display.configure(state="disabled")
+
+        if not self.assistant.running:
+            self.worker.stop()
+            self.after(500, self.destroy)
+            return
+        self.after(DRAIN_INTERVAL_MS, self._drain_messages)
+
+    def _on_command_dropped(self, command):
+        self.update_chat(f"Commande ignorée (trop de commandes en attente) : {command}")
+
+    def cancel_commands(self):
+        """Drops the waiting commands and interrupts the current answer."""
+        dropped = self.worker.cancel_pending()
+        self.assistant.interrupt_speech()
+        if dropped:
+            self.update_chat(f"{len(dropped)} commande(s) annulée(s).")
 
     def start_listening_thread(self):
         """Starts listening in a background thread to allow GUI updates."""
         if not self.is_listening:
             self.is_listening = True
+            # Barge-in: the user wants to talk, stop the current answer
+            self.assistant.interrupt_speech()
             self.listen_button.configure(text="🛑 Écoute en cours...", fg_color="#a51f1f", hover_color="#701414")
             threading.Thread(target=self.run_listening_cycle, daemon=True).start()
 
@@ -74,17 +121,14 @@ class AssistantGUI(ctk.CTk):
             return
         self.text_entry.delete(0, "end")
         self.update_chat(f"Vous: {text}")
-        threading.Thread(target=self._process_text, args=(text,), daemon=True).start()
+        self.worker.submit(text)
 
     def _process_text(self, text):
-        """Processes a text command in a background thread."""
+        """Processes a command on the command worker thread."""
         try:
             self.assistant.process_command(text.lower())
-            if not self.assistant.running:
-                self.after(500, self.destroy)
         except Exception as e:
-            error_msg = str(e)
-            self.after(0, lambda: self.update_chat(f"Erreur: {error_msg}"))
+            self.update_chat(f"Erreur: {e}")
 
     def run_listening_cycle(self):
         """Runs one cycle of listen -> process."""
@@ -94,21 +138,17 @@ class AssistantGUI(ctk.CTk):
             
             # Update GUI with user text if valid
             if text:
-                self.after(0, lambda: self.update_chat(f"Vous: {text}"))
+                self.update_chat(f"Vous: {text}")
                 
-                # 2. Process
-                self.assistant.process_command(text)
-
-                if not self.assistant.running:
-                    self.after(500, self.destroy)
+                # 2. Process (on the command worker)
+                self.worker.submit(text)
             
         except Exception as e:
-            error_msg = str(e)
-            self.after(0, lambda: self.update_chat(f"Erreur: {error_msg}"))
+            self.update_chat(f"Erreur: {e}")
         finally:
             # Reset button state
             self.is_listening = False
-            self.after(0, lambda: self.reset_button())
+            self.messages.call(self.reset_button)
 
     def reset_button(self):
         self.listen_button.configure(text="🎙️ Écouter", fg_color="#1f6aa5", hover_color="#144870")
@@ -0,0 +1,92 @@
+import queue
+import threading
+from collections import deque
+
+
+class UiMessageQueue:
+    """Thread-safe mailbox between worker threads and the Tk main loop.
+
+    Workers post chat messages (str) or callables; the GUI drains them from
+    its own thread with after(), so widgets are never touched off-thread.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def post(self, message):
+        self._queue.put(message)
+
+    def call(self, fn):
+        """Runs fn() on the GUI thread at the next drain."""
+        self._queue.put(fn)
+
+    def drain(self, max_items=200):
+        items = []
+        while len(items) < max_items:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+
+class CommandWorker:
+    """Runs commands one at a time on a single thread, from a bounded queue.
+
+    When max_pending commands are already waiting, the oldest one is dropped
+    (and reported through on_dropped) to make room: the latest request is
+    the one the user still cares about.
+    """
+
+    def __init__(self, handler, max_pending=3, on_dropped=None):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.on_dropped = on_dropped
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.busy = False
+        self._thread = threading.Thread(target=self._run, name="command-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, command):
+        dropped = []
+        with self._cond:
+            while len(self._pending) >= self.max_pending:
+                dropped.append(self._pending.popleft())
+            self._pending.append(command)
+            self._cond.notify()
+        for old in dropped:
+            if self.on_dropped:
+                self.on_dropped(old)
+
+    def cancel_pending(self):
+        """Drops every command that has not started yet. Returns them."""
+        with self._cond:
+            dropped = list(self._pending)
+            self._pending.clear()
+        return dropped
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                command = self._pending.popleft()
+                self.busy = True
+            try:
+                self.handler(command)
+            finally:
+                self.busy = False
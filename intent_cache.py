@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from text_normalize import normalize_text
+
+
+def cache_key(text):
+    """Normalized form of an utterance: case, accents, punctuation and spacing are ignored."""
+    return normalize_text(text, strip_punctuation=True)
+
+
+class IntentCache:
+    """Bounded LRU cache of LLM intents with TTL expiry and optional JSON persistence."""
+
+    def __init__(self, max_size=256, ttl=24 * 3600, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict() # key -> (timestamp, intent)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if self.path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, stored_at, intent in items:
+            if now - stored_at < self.ttl:
+                self._entries[key] = (stored_at, intent)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump([[k, t, i] for k, (t, i) in self._entries.items()], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Erreur écriture cache intentions: {e}")
+
+    def get(self, text):
+        key = cache_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, intent = entry
+            if time.time() - stored_at >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(intent)
+
+    def put(self, text, intent):
+        # Errors are transient and must never be replayed from the cache
+        if not isinstance(intent, dict) or intent.get("action") == "error":
+            return
+        key = cache_key(text)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), dict(intent))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if self.path:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
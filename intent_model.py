@@ -0,0 +1,365 @@
+import os
+import sys
+import math
+import json
+import time
+import threading
+from collections import Counter, defaultdict
+from paths import cache_dir
+from text_normalize import normalize_text
+from tracing import percentiles, traced
+
+try:
+    import numpy as np
+    from scipy import sparse
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Usage: python intent_model.py train             -> intents_fr_train.jsonl + logged LLM answers
+#        python intent_model.py eval [fichier]    -> accuracy, precision at the threshold and µs per prediction
+#                                                   (intents_fr_eval.jsonl: phrasings absent from the seed set)
+# The model learns from what the LLM answered: every LLM intent is logged to
+# ~/.cache/ia_navigation/intent_log.jsonl (INTENT_LOG=0 to disable).
+
+SLOT_FIELDS = {"open": "target", "search": "search", "play": "search"}
+# A slot naming a platform ("trouve sur youtube ...") means the phrasing around it was misread
+_PLATFORM_WORDS = {"google", "youtube", "internet", "web"}
+DEFAULT_THRESHOLD = float(os.getenv("INTENT_MODEL_THRESHOLD", "0.85"))
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents_fr_train.jsonl")
+EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents_fr_eval.jsonl")
+
+
+def model_path():
+    return os.path.join(cache_dir(), "intent_model.npz")
+
+
+def log_path():
+    return os.path.join(cache_dir(), "intent_log.jsonl")
+
+
+def load_examples(path):
+    """[(text, intent)] from a JSON lines file of {"text", "intent"}."""
+    examples = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    examples.append((entry["text"], entry["intent"]))
+    except OSError:
+        pass
+    return examples
+
+
+class IntentLog:
+    """Appends (utterance, intent) pairs answered by the LLM, the model's training data."""
+
+    def __init__(self, path=None):
+        self.path = path or log_path()
+        self._lock = threading.Lock()
+
+    def add(self, text, intent):
+        # Errors and compound answers don't make single-intent training examples
+        if not isinstance(intent, dict) or intent.get("action") in (None, "error"):
+            return
+        line = json.dumps({"text": text, "intent": intent, "ts": time.time()}, ensure_ascii=False)
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                print(f"Erreur journal intentions: {e}")
+
+
+def _clean(text):
+    """Lowercase with collapsed spaces and no trailing punctuation (accents kept for slots)."""
+    return " ".join((text or "").lower().split()).strip(" .!?,;")
+
+
+class CharNgramVectorizer:
+    """Character n-gram TF-IDF (sublinear tf, smoothed idf, L2-normalized rows)."""
+
+    def __init__(self, ngram_range=(2, 4), vocabulary=None, idf=None):
+        self.ngram_range = ngram_range
+        self.vocabulary = vocabulary or {}
+        self.idf = idf
+
+    def _ngrams(self, text):
+        padded = f" {normalize_text(text, strip_punctuation=True)} "
+        low, high = self.ngram_range
+        return Counter(padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1))
+
+    def fit(self, texts):
+        df = Counter()
+        for text in texts:
+            df.update(self._ngrams(text).keys())
+        self.vocabulary = {gram: i for i, gram in enumerate(sorted(df))}
+        counts = np.array([df[gram] for gram in sorted(df)], dtype=np.float64)
+        self.idf = np.log((1 + len(texts)) / (1 + counts)) + 1
+        return self
+
+    def transform_one(self, text):
+        """(columns, weights) of one utterance: the hot path, without building a matrix."""
+        cols, values = [], []
+        for gram, count in self._ngrams(text).items():
+            col = self.vocabulary.get(gram)
+            if col is not None:
+                cols.append(col)
+                values.append(1 + math.log(count))
+        values = np.array(values) * self.idf[cols]
+        norm = np.sqrt(values @ values)
+        return cols, values / norm if norm else values
+
+    def transform(self, texts):
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for gram, count in self._ngrams(text).items():
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    values.append((1 + np.log(count)) * self.idf[col])
+        X = sparse.csr_matrix((values, (rows, cols)), shape=(len(texts), len(self.vocabulary)))
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1 / norms) @ X
+
+
+class IntentModel:
+    """Softmax regression over character n-grams predicting the action, plus slot extraction.
+
+    The slot (target for open, search for search/play) is what remains of
+    the utterance once a prefix/suffix seen in training for that action
+    ("ouvre-moi", "cherche ... sur youtube") is removed. Other fields take
+    the most common value seen for the action.
+    """
+
+    def __init__(self, vectorizer, weights, bias, classes, affixes, defaults, threshold=DEFAULT_THRESHOLD):
+        self.vectorizer = vectorizer
+        self.weights = weights
+        self.bias = bias
+        self.classes = classes
+        self.affixes = affixes # action -> {"prefixes": [...], "suffixes": [...]}, longest first
+        self.defaults = defaults # action -> {field: value}
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def train(cls, examples, epochs=1000, learning_rate=10.0, l2=1e-4):
+        texts = [text for text, _ in examples]
+        actions = [intent.get("action") or "unknown" for _, intent in examples]
+        classes = sorted(set(actions))
+        vectorizer = CharNgramVectorizer().fit(texts)
+        X = vectorizer.transform(texts)
+        Y = np.zeros((len(texts), len(classes)))
+        Y[np.arange(len(texts)), [classes.index(a) for a in actions]] = 1.0
+
+        # Full-batch gradient descent on the cross-entropy: small data, converges in a blink
+        W = np.zeros((X.shape[1], len(classes)))
+        b = np.zeros(len(classes))
+        for _ in range(epochs):
+            P = _softmax(X @ W + b)
+            G = (P - Y) / len(texts)
+            W -= learning_rate * (X.T @ G + l2 * W)
+            b -= learning_rate * G.sum(axis=0)
+
+        affixes, defaults = cls._learn_slots(examples)
+        return cls(vectorizer, W, b, classes, affixes, defaults)
+
+    @staticmethod
+    def _learn_slots(examples):
+        prefixes = defaultdict(Counter)
+        suffixes = defaultdict(Counter)
+        fields = defaultdict(lambda: defaultdict(Counter))
+        for text, intent in examples:
+            action = intent.get("action")
+            for field in ("target", "platform", "search"):
+                if field != SLOT_FIELDS.get(action):
+                    fields[action][field][intent.get(field)] += 1
+            slot = _clean(intent.get(SLOT_FIELDS.get(action)) or "")
+            clean = _clean(text)
+            start = clean.find(slot) if slot else -1
+            if start >= 0:
+                prefixes[action][clean[:start].strip()] += 1
+                suffixes[action][clean[start + len(slot):].strip()] += 1
+        affixes = {
+            action: {
+                "prefixes": sorted(prefixes[action], key=len, reverse=True),
+                "suffixes": sorted(suffixes[action], key=len, reverse=True),
+            }
+            for action in prefixes
+        }
+        defaults = {action: {field: counts.most_common(1)[0][0] for field, counts in by_field.items()}
+                    for action, by_field in fields.items()}
+        return affixes, defaults
+
+    def _extract_slot(self, action, text):
+        """The slot of text for action, or None if the phrasing around it was never seen."""
+        clean = _clean(text)
+        affixes = self.affixes.get(action)
+        if not affixes:
+            return None
+        for prefix in affixes["prefixes"]:
+            if prefix and clean.startswith(prefix + " "):
+                clean = clean[len(prefix) + 1:]
+                break
+        else:
+            if "" not in affixes["prefixes"]:
+                # Unseen phrasing ("peux-tu ouvrir obs"): where the slot starts is a guess
+                return None
+        for suffix in affixes["suffixes"]:
+            if suffix and clean.endswith(" " + suffix):
+                clean = clean[:-len(suffix) - 1]
+                break
+        if _PLATFORM_WORDS & set(normalize_text(clean, strip_punctuation=True).split()):
+            return None
+        return clean.strip() or None
+
+    def predict(self, text):
+        """Intent dict in the LLM schema; confidence is the action probability."""
+        cols, values = self.vectorizer.transform_one(text)
+        probabilities = _softmax([values @ self.weights[cols] + self.bias])[0]
+        best = int(np.argmax(probabilities))
+        action = self.classes[best]
+        intent = {"action": action, "target": None, "platform": None, "search": None}
+        intent.update(self.defaults.get(action, {}))
+        intent["confidence"] = float(probabilities[best])
+        intent["source"] = "model"
+        field = SLOT_FIELDS.get(action)
+        if field:
+            intent[field] = self._extract_slot(action, text)
+            if not intent[field]:
+                intent["confidence"] = 0.0 # Nothing to act on: let the LLM handle it
+        return intent
+
+    @traced("model")
+    def match(self, text):
+        """Returns the predicted intent if confident enough, else None (caller uses the LLM).
+
+        "unknown" is never returned: the LLM may still make sense of the command.
+        """
+        intent = self.peek(text)
+        self.record(intent is not None)
+        return intent
+
+    def peek(self, text):
+        """match() without counting it (speculative lookups, see record())."""
+        intent = self.predict(text)
+        if intent["confidence"] >= self.threshold and intent["action"] != "unknown":
+            return intent
+        return None
+
+    def record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def save(self, path=None):
+        path = path or model_path()
+        meta = {
+            "classes": self.classes,
+            "vocabulary": self.vectorizer.vocabulary,
+            "ngram_range": self.vectorizer.ngram_range,
+            "affixes": self.affixes,
+            "defaults": self.defaults,
+        }
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, weights=self.weights, bias=self.bias, idf=self.vectorizer.idf,
+                            meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None, threshold=DEFAULT_THRESHOLD):
+        """Loads the trained model, or returns None if there is none (or no NumPy)."""
+        path = path or model_path()
+        if not HAS_NUMPY or not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            vectorizer = CharNgramVectorizer(tuple(meta["ngram_range"]), meta["vocabulary"], data["idf"])
+            return cls(vectorizer, data["weights"], data["bias"], meta["classes"],
+                       meta["affixes"], meta["defaults"], threshold)
+
+
+def _softmax(scores):
+    scores = np.asarray(scores)
+    exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def evaluate(model, examples):
+    """Action/slot accuracy, what match() would accept at the threshold and µs per prediction.
+
+    precision is the share of accepted intents that are right (action and
+    slot): a wrong accepted intent is acted upon without the LLM. Examples
+    labelled "unknown" (closing an app, negations, out of domain...) must
+    fall through.
+    """
+    correct = slots_ok = accepted = accepted_ok = 0
+    latencies = []
+    for text, expected in examples:
+        start = time.perf_counter()
+        intent = model.predict(text)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        action_ok = intent["action"] == expected.get("action")
+        field = SLOT_FIELDS.get(expected.get("action"))
+        slot_ok = action_ok and (not field or _clean(intent.get(field)) == _clean(expected.get(field)))
+        correct += action_ok
+        slots_ok += slot_ok
+        # Same rule as match()
+        if intent["confidence"] >= model.threshold and intent["action"] != "unknown":
+            accepted += 1
+            accepted_ok += slot_ok
+    n = len(examples)
+    return {
+        "examples": n,
+        "action_accuracy": correct / n,
+        "slot_accuracy": slots_ok / n,
+        "accepted": accepted / n,
+        "precision": accepted_ok / accepted if accepted else 1.0,
+        "misfires": accepted - accepted_ok,
+        "latency_us": {"mean": sum(latencies) / n, **percentiles(latencies)},
+    }
+
+
+if __name__ == "__main__":
+    if not HAS_NUMPY:
+        print("NumPy et SciPy sont nécessaires (pip install numpy scipy).")
+        sys.exit(1)
+    command = sys.argv[1] if len(sys.argv) > 1 else "eval"
+
+    if command == "train":
+        examples = {}
+        # Logged LLM answers override the seed set for the same utterance
+        for text, intent in load_examples(SEED_PATH) + load_examples(log_path()):
+            examples[_clean(text)] = (text, intent)
+        start = time.perf_counter()
+        model = IntentModel.train(list(examples.values()))
+        model.save()
+        print(f"{len(examples)} exemples, {len(model.vectorizer.vocabulary)} n-grammes, "
+              f"classes {model.classes}, entraîné en {time.perf_counter() - start:.2f} s -> {model_path()}")
+
+    elif command == "eval":
+        model = IntentModel.load()
+        if model is None:
+            print("Aucun modèle : lancez d'abord 'python intent_model.py train'.")
+            sys.exit(1)
+        examples = load_examples(sys.argv[2] if len(sys.argv) > 2 else EVAL_PATH)
+        result = evaluate(model, examples)
+        latency = result["latency_us"]
+        print(f"{result['examples']} exemples")
+        print(f"  action : {result['action_accuracy']:.1%} | action + champ : {result['slot_accuracy']:.1%}")
+        print(f"  acceptées au seuil {model.threshold} : {result['accepted']:.1%} | précision "
+              f"{result['precision']:.1%} ({result['misfires']} erreurs exécutées sans le LLM)")
+        print(f"  latence : moy {latency['mean']:.0f} µs | p50 {latency['p50']:.0f} | "
+              f"p95 {latency['p95']:.0f} | p99 {latency['p99']:.0f}")
+
+    else:
+        print("Usage: python intent_model.py train | eval [fichier]")
+        sys.exit(1)
@@ -0,0 +1,164 @@
+import os
+import re
+from thefuzz import fuzz
+from text_normalize import normalize_text
+from tracing import traced
+
+# Shared vocabulary, also used by the legacy keyword fallback in Assistant
+OPEN_KEYWORDS = ["ouvre", "ouvrir", "lance", "lancer", "démarrer", "démarre", "start", "open"]
+SEARCH_KEYWORDS = ["cherche", "recherche", "trouve", "trouver", "google", "search"]
+PLAY_KEYWORDS = ["joue", "jouer", "mets", "mettre"]
+QUIT_KEYWORDS = ["quitter", "quitte", "stop", "au revoir", "arrête", "arrête-toi", "exit"]
+
+DEFAULT_THRESHOLD = float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.8"))
+
+
+def _alternation(words):
+    # Longest first so "recherche" wins over "cherche"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+# Up to two pronoun/article tokens before the object: "ouvre moi la calculatrice", "mets-nous du jazz"
+_ARTICLES = r"(?:-(?:moi|nous)\s+|\s+)(?:(?:moi|nous|de la|le|la|les|un|une|des|du)\s+|(?:de )?l'){0,2}"
+_QUIT_RE = re.compile(rf"^(?:{_alternation(QUIT_KEYWORDS)})$")
+_OPEN_RE = re.compile(rf"^(?:{_alternation(OPEN_KEYWORDS)}){_ARTICLES}(?P<target>.+)$")
+_SEARCH_RE = re.compile(
+    rf"^(?:{_alternation(SEARCH_KEYWORDS)})\s+(?P<search>.+?)"
+    r"(?:\s+sur\s+(?P<platform>google|internet|le web|youtube))?$"
+)
+_PLAY_RE = re.compile(rf"^(?:{_alternation(PLAY_KEYWORDS)}){_ARTICLES}(?P<search>.+?)(?:\s+sur\s+youtube)?$")
+# "joue"/"mets" alone are ambiguous ("mets le volume à fond"): a play needs one of these
+_MEDIA_RE = re.compile(
+    r"\b(?:musique|chansons?|vid[ée]os?|clips?|albums?|morceaux?|titres?|playlists?|"
+    r"sons?|films?|podcasts?|bandes? annonces?|youtube)\b"
+)
+_TRAILING_RE = re.compile(r"[\s.!?,;]+$")
+# "ouvre firefox et cherche la météo": a connector followed by another action verb
+_COMPOUND_RE = re.compile(
+    r"(?:\s*,)?\s*(?P<conn>\bet puis\b|\bpuis\b|\bensuite\b|\bet\b|,)\s*"
+    rf"(?=(?:{_alternation(OPEN_KEYWORDS + SEARCH_KEYWORDS + PLAY_KEYWORDS + QUIT_KEYWORDS)})\b)"
+)
+_SEQUENTIAL_CONNECTORS = {"puis", "et puis", "ensuite"}
+
+
+def split_compound(command):
+    """Splits a compound command into [(segment, sequential)].
+
+    sequential is True when the segment was introduced by "puis"/"ensuite",
+    i.e. it must wait for the previous actions.
+    """
+    parts = []
+    start = 0
+    sequential = False
+    for m in _COMPOUND_RE.finditer(command):
+        parts.append((command[start:m.start()], sequential))
+        sequential = m.group("conn") in _SEQUENTIAL_CONNECTORS
+        start = m.end()
+    parts.append((command[start:], sequential))
+    return [(segment, seq) for segment, seq in parts if segment]
+
+
+def _intent(action, target=None, platform=None, search=None, confidence=0.0):
+    return {
+        "action": action,
+        "target": target,
+        "platform": platform,
+        "search": search,
+        "confidence": confidence,
+        "source": "local",
+    }
+
+
+class RuleIntentClassifier:
+    """Compiled keyword patterns that resolve unambiguous commands without the LLM.
+
+    classify() always returns an intent dict in the LLM schema with a confidence
+    score; match() only returns it when the score reaches the threshold and keeps
+    hit/miss counters of how much traffic skips the API.
+    """
+
+    def __init__(self, app_index=None, threshold=DEFAULT_THRESHOLD):
+        self.app_index = app_index
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+
+    def classify(self, text):
+        command = _TRAILING_RE.sub("", " ".join((text or "").lower().split()))
+        if not command:
+            return _intent("unknown")
+
+        parts = split_compound(command)
+        if len(parts) > 1:
+            intents = []
+            for segment, sequential in parts:
+                intent = self.classify(segment)
+                if sequential:
+                    intent["sequential"] = True
+                intents.append(intent)
+            # Local only if every part is: otherwise the LLM gets the whole sentence
+            return {"intents": intents, "confidence": min(i["confidence"] for i in intents), "source": "local"}
+
+        if _QUIT_RE.match(command):
+            return _intent("quit", confidence=1.0)
+
+        m = _OPEN_RE.match(command)
+        if m:
+            target = m.group("target")
+            result = self.app_index.extract_one(target) if self.app_index else None
+            if result and result[1] > 70:
+                # WRatio also scores partial and token-set matches high ("lance la musique de
+                # queen" -> "gestionnaire de fichiers"): only a close match of the whole target
+                # is confident, the others stay below the threshold
+                strict = fuzz.ratio(normalize_text(target), normalize_text(result[0]))
+                intent = _intent("open", target=result[0], confidence=0.95 if strict >= 90 else 0.6)
+                # What was said and how well it matched: the usage store learns the phrasing
+                intent["query"], intent["match_score"] = target, result[1]
+                return intent
+            # Could be "lance la musique ...", let the LLM decide
+            return _intent("open", target=target, confidence=0.4)
+
+        m = _SEARCH_RE.match(command)
+        if m:
+            search = m.group("search")
+            platform = m.group("platform")
+            if platform == "youtube":
+                # search_web() switches to YouTube results when the query mentions it
+                return _intent("search", target="youtube", platform="youtube",
+                               search=f"{search} youtube", confidence=0.9)
+            return _intent("search", target="google", platform="google",
+                           search=search, confidence=0.9)
+
+        m = _PLAY_RE.match(command)
+        if m:
+            confidence = 0.85 if _MEDIA_RE.search(command) else 0.5
+            return _intent("play", target="youtube", platform="youtube",
+                           search=m.group("search"), confidence=confidence)
+
+        return _intent("unknown", confidence=0.0)
+
+    @traced("rules")
+    def match(self, text):
+        """Returns the local intent if confident enough, else None (caller uses the LLM)."""
+        intent = self.peek(text)
+        self.record(intent is not None)
+        return intent
+
+    def peek(self, text):
+        """match() without counting it (speculative lookups, see record())."""
+        intent = self.classify(text)
+        return intent if intent["confidence"] >= self.threshold else None
+
+    def record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "local": self.hits,
+            "llm": self.misses,
+            "local_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,166 @@
+import json
+import time
+
+# Fields an action needs before it can be dispatched
+REQUIRED_FIELDS = {
+    "open": ("target",),
+    "search": ("search",),
+    "play": ("search",),
+    "quit": (),
+    "close": (),
+}
+
+_LITERAL_END = set(",}] \t\r\n")
+
+
+class IncrementalJSONParser:
+    """Incremental parser for the flat JSON object returned by the LLM.
+
+    Chunks are fed as they arrive; every top-level field is exposed in
+    self.fields as soon as its value is complete, without waiting for the
+    closing brace. Nested values are kept as parsed JSON once closed.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._value_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        buf = self._buffer
+        while self._pos < len(buf) and not self.done:
+            c = buf[self._pos]
+            state = self._state
+
+            if state == "start":
+                if c == "{":
+                    self._state = "key_or_end"
+            elif state == "key_or_end":
+                if c == '"':
+                    self._state = "key"
+                    self._value_start = self._pos
+                elif c == "}":
+                    self.done = True
+            elif state == "key":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._key = json.loads(buf[self._value_start:self._pos + 1])
+                    self._state = "colon"
+            elif state == "colon":
+                if c == ":":
+                    self._state = "value"
+            elif state == "value":
+                if not c.isspace():
+                    self._value_start = self._pos
+                    if c == '"':
+                        self._state = "string"
+                    elif c in "{[":
+                        self._state = "nested"
+                        self._depth = 1
+                    else:
+                        self._state = "literal"
+            elif state == "string":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._store(self._pos + 1)
+            elif state == "nested":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                elif c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._store(self._pos + 1)
+            elif state == "literal":
+                if c in _LITERAL_END:
+                    self._store(self._pos)
+                    # Re-read the delimiter in the "after value" state
+                    continue
+            elif state == "after_value":
+                if c == ",":
+                    self._state = "key_or_end"
+                elif c == "}":
+                    self.done = True
+            self._pos += 1
+        return self.fields
+
+    def _store(self, end):
+        raw = self._buffer[self._value_start:end].strip()
+        try:
+            self.fields[self._key] = json.loads(raw)
+        except ValueError:
+            self.fields[self._key] = raw
+        self._state = "after_value"
+
+
+def ready_intent(fields):
+    """Returns the intent if its action and the fields it needs are complete, else None."""
+    action = fields.get("action")
+    if action not in REQUIRED_FIELDS:
+        return None
+    if all(name in fields for name in REQUIRED_FIELDS[action]):
+        return dict(fields)
+    return None
+
+
+def consume_stream(chunks, on_ready=None):
+    """Parses a token stream, calling on_ready(intent) once dispatchable.
+
+    Returns (intent, timings) where timings holds time-to-first-action and
+    time-to-full-response in seconds.
+    """
+    start = time.perf_counter()
+    parser = IncrementalJSONParser()
+    timings = {"first_action": None, "full": None}
+    text = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text += chunk
+        parser.feed(chunk)
+        if timings["first_action"] is None:
+            intent = ready_intent(parser.fields)
+            if intent is not None:
+                timings["first_action"] = time.perf_counter() - start
+                if on_ready:
+                    on_ready(intent)
+    timings["full"] = time.perf_counter() - start
+    # The complete answer is authoritative, the incremental fields are only a shortcut
+    intent = json.loads(text)
+    return intent, timings
+
+
+class FakeStreamSource:
+    """Replays a canned completion in small chunks with a per-chunk delay (for tests)."""
+
+    def __init__(self, content, chunk_size=3, delay=0.01):
+        self.content = content
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    def __iter__(self):
+        for i in range(0, len(self.content), self.chunk_size):
+            time.sleep(self.delay)
+            yield self.content[i:i + self.chunk_size]
@@ -0,0 +1,286 @@
+import os
+import re
+import shlex
+import shutil
+import threading
+import subprocess
+import time
+from paths import cache_dir
+from tracing import percentiles
+
+# Usage: python launcher.py <commande ...>   -> launches it like the assistant and prints the timings
+# Apps are exec'd directly (no shell), detached from the assistant's session,
+# with their output sent to /dev/null or, with LAUNCH_LOG=1, to a size-rotated
+# ~/.cache/ia_navigation/launch.log. Set LAUNCH_REUSE=0 to always start a new
+# instance instead of raising the window of a running one. Running instances are
+# found from a snapshot of /proc refreshed at most every LAUNCH_SCAN_TTL seconds (30):
+# an app is its binary, or its script for "python3 /usr/bin/app"-style Exec lines;
+# wrappers (env, flatpak run...) always start a new instance.
+
+
+# An Exec line starting with an interpreter runs the script it is given: any other process
+# of that interpreter (the assistant's own gui.py...) is not a running instance of the app.
+# Wrappers start something else entirely, there is nothing to compare.
+_INTERPRETERS = {"python", "perl", "ruby", "node", "java", "sh", "bash", "dash", "zsh"}
+_WRAPPERS = {"env", "flatpak", "snap", "gtk-launch", "xdg-open", "gio", "nohup", "pkexec", "sudo"}
+
+
+def _is_interpreter(path):
+    return re.sub(r"[\d.]+$", "", os.path.basename(path)) in _INTERPRETERS
+
+
+def reuse_key(argv, executable):
+    """Real path identifying the app argv starts, or None when a running instance can't be told apart."""
+    if os.path.basename(argv[0]) in _WRAPPERS:
+        return None
+    if _is_interpreter(argv[0]):
+        # "python3 /usr/bin/app", "java -jar app.jar": the app is the first non-option argument
+        script = next((arg for arg in argv[1:] if not arg.startswith("-")), None)
+        return os.path.realpath(script) if script and os.path.isfile(script) else None
+    return os.path.realpath(executable)
+
+
+def _read_proc(pid, name):
+    try:
+        with open(f"/proc/{pid}/{name}", "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def _executables(pid):
+    """Real paths pid runs: its binary and, for scripts (firefox, code...), the script."""
+    paths = []
+    try:
+        paths.append(os.path.realpath(f"/proc/{pid}/exe"))
+    except OSError:
+        pass
+    args = [os.fsdecode(arg) for arg in _read_proc(pid, "cmdline").split(b"\0") if arg]
+    if args and (_is_interpreter(args[0]) or any(_is_interpreter(path) for path in paths)):
+        # The interpreter's first non-option argument, as reuse_key() picks it
+        script = next((arg for arg in args[1:] if not arg.startswith("-")), None)
+        if script:
+            paths.append(os.path.realpath(script))
+    elif args:
+        paths.append(os.path.realpath(args[0]))
+    return paths
+
+
+def _runs(pid, target):
+    return os.path.exists(f"/proc/{pid}") and target in _executables(pid)
+
+
+class Launcher:
+    """Starts applications from their argv and keeps per-app launch statistics.
+
+    launch() returns once the child has exec'd: the measured latency is the
+    launch-to-spawn time (binary lookup, running-instance check, fork/exec).
+    A single reaper thread collects exited children so none is left a zombie.
+    The running-instance check reads a cached /proc snapshot (executable ->
+    pid, our own spawns added) instead of scanning /proc on every launch.
+    """
+
+    def __init__(self, reuse=None, log_path=None, log_max_bytes=1 << 20, log_backups=2, scan_ttl=None):
+        if reuse is None:
+            reuse = os.getenv("LAUNCH_REUSE", "1") == "1"
+        if scan_ttl is None:
+            scan_ttl = float(os.getenv("LAUNCH_SCAN_TTL", "30"))
+        if log_path is None and os.getenv("LAUNCH_LOG", "0") == "1":
+            log_path = os.path.join(cache_dir(), "launch.log")
+        self.reuse = reuse
+        self.log_path = log_path
+        self.log_max_bytes = log_max_bytes
+        self.log_backups = log_backups
+        self.scan_ttl = scan_ttl
+        self._lock = threading.Lock()
+        self._running = {} # executable (real path) -> pid, from the last /proc scan
+        self._scanned_at = None
+        self._children = [] # (name, Popen) not reaped yet
+        self._resolved = {} # program -> path, filled by prewarm()
+        self._lookups = {"prewarmed": [0, 0.0], "cold": [0, 0.0]} # -> [launches, seconds]
+        self._reaper = None
+        self.latencies = {} # app -> [seconds]
+        self.counters = {"spawned": 0, "reused": 0, "reaped": 0, "failed": 0, "scans": 0}
+
+    def launch(self, cmd):
+        """Starts cmd (argv list, or a command line string) or raises its running instance.
+
+        Returns {"app", "pid", "reused", "spawn_ms"}. Raises FileNotFoundError
+        when the program is not installed.
+        """
+        start = time.perf_counter()
+        argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+        app = os.path.basename(argv[0])
+        executable = self._resolved.get(argv[0])
+        prewarmed = executable is not None and os.access(executable, os.X_OK)
+        if not prewarmed:
+            executable = shutil.which(argv[0])
+        with self._lock:
+            lookup = self._lookups["prewarmed" if prewarmed else "cold"]
+            lookup[0] += 1
+            lookup[1] += time.perf_counter() - start
+        if executable is None:
+            self._count("failed")
+            raise FileNotFoundError(f"Programme introuvable : {argv[0]}")
+
+        key = reuse_key(argv, executable) if self.reuse else None
+        pid = self.find_running(key) if key else None
+        if pid is not None and self._activate(pid):
+            self._count("reused")
+            return self._record(app, pid, True, start)
+
+        with self._output() as output:
+            process = subprocess.Popen(
+                [executable] + argv[1:], stdin=subprocess.DEVNULL, stdout=output, stderr=output,
+                start_new_session=True, close_fds=True,
+            )
+        self._count("spawned")
+        with self._lock:
+            if key:
+                self._running[key] = process.pid
+            self._children.append((app, process))
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, name="launcher-reaper", daemon=True)
+                self._reaper.start()
+        return self._record(app, process.pid, False, start)
+
+    def prewarm(self, cmds, preread=False):
+        """Resolves the programs of cmds ahead of their launch.
+
+        With preread, their binaries are also hinted into the page cache
+        (posix_fadvise WILLNEED), so a first launch doesn't wait on the disk.
+        The /proc snapshot of running instances is taken here too.
+        """
+        if self.reuse:
+            self.scan()
+        for cmd in cmds:
+            program = (shlex.split(cmd) if isinstance(cmd, str) else cmd)[0]
+            path = shutil.which(program)
+            if path is None:
+                continue
+            with self._lock:
+                self._resolved[program] = path
+            if preread and hasattr(os, "posix_fadvise"):
+                try:
+                    fd = os.open(os.path.realpath(path), os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+
+    def _record(self, app, pid, reused, start):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies.setdefault(app, []).append(elapsed)
+        return {"app": app, "pid": pid, "reused": reused, "spawn_ms": elapsed * 1000}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _output(self):
+        """File object for the child's stdout/stderr (the parent's copy is closed after the spawn)."""
+        if not self.log_path:
+            return open(os.devnull, "wb")
+        try:
+            if os.path.getsize(self.log_path) > self.log_max_bytes:
+                for index in range(self.log_backups - 1, 0, -1):
+                    if os.path.exists(f"{self.log_path}.{index}"):
+                        os.replace(f"{self.log_path}.{index}", f"{self.log_path}.{index + 1}")
+                os.replace(self.log_path, f"{self.log_path}.1")
+        except OSError:
+            pass
+        return open(self.log_path, "ab")
+
+    def _reap(self):
+        # One thread for every child: poll() is a non-blocking waitpid on its pid only
+        while True:
+            time.sleep(0.5)
+            with self._lock:
+                alive = [(app, p) for app, p in self._children if p.poll() is None]
+                self.counters["reaped"] += len(self._children) - len(alive)
+                self._children = alive
+                if not alive:
+                    self._reaper = None
+                    return
+
+    def find_running(self, executable):
+        """Pid of a process of ours running executable (directly or as a script), or None."""
+        target = os.path.realpath(executable)
+        with self._lock:
+            pid = self._running.get(target)
+            fresh = self._scanned_at is not None and time.monotonic() - self._scanned_at < self.scan_ttl
+        if pid is not None and _runs(pid, target):
+            return pid
+        if fresh:
+            return None
+        return self.scan().get(target)
+
+    def scan(self):
+        """Snapshot of the executables our processes run ({real path: pid}), cached for find_running."""
+        running = {}
+        uid = os.getuid()
+        own = os.getpid()
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit() or int(entry.name) == own:
+                continue
+            try:
+                if entry.stat().st_uid != uid:
+                    continue
+            except OSError:
+                continue
+            for path in _executables(entry.name):
+                running.setdefault(path, int(entry.name))
+        with self._lock:
+            self._running = running
+            self._scanned_at = time.monotonic()
+            self.counters["scans"] += 1
+        return running
+
+    def _activate(self, pid):
+        """Raises a window of pid (xdotool or wmctrl); False if there is none or no tool."""
+        try:
+            if shutil.which("xdotool"):
+                windows = subprocess.run(["xdotool", "search", "--onlyvisible", "--pid", str(pid)],
+                                         capture_output=True, text=True, timeout=1).stdout.split()
+                if windows:
+                    subprocess.run(["xdotool", "windowactivate", windows[-1]], capture_output=True, timeout=1)
+                    return True
+            elif shutil.which("wmctrl"):
+                listing = subprocess.run(["wmctrl", "-lp"], capture_output=True, text=True, timeout=1).stdout
+                for line in listing.splitlines():
+                    fields = line.split()
+                    if len(fields) > 2 and fields[2] == str(pid):
+                        subprocess.run(["wmctrl", "-ia", fields[0]], capture_output=True, timeout=1)
+                        return True
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        return False
+
+    def stats(self):
+        """Counters and launch-to-spawn p50/p95 (ms) per app."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["running"] = len(self._children)
+            (warm, warm_time), (cold, cold_time) = self._lookups["prewarmed"], self._lookups["cold"]
+            stats["prewarmed_hits"] = warm
+            # Program lookups the pre-warming made unnecessary
+            stats["lookup_saved_ms"] = max(0.0, cold_time / cold - warm_time / warm) * 1000 * warm if warm and cold else 0.0
+            stats["apps"] = {
+                app: {"launches": len(samples),
+                      **{key: value * 1000 for key, value in percentiles(samples, (50, 95)).items()}}
+                for app, samples in self.latencies.items()
+            }
+        return stats
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python launcher.py <commande ...>")
+        sys.exit(1)
+    launcher = Launcher()
+    print(launcher.launch(sys.argv[1:]))
+    print(launcher.stats())
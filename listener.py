@@ -0,0 +1,227 @@
+import sys
+import math
+import time
+import wave
+import queue
+import threading
+from array import array
+from collections import deque
+
+try:
+    import speech_recognition as sr
+    HAS_SPEECH_RECOGNITION = True
+except ImportError:
+    HAS_SPEECH_RECOGNITION = False
+
+_TYPECODES = {1: "b", 2: "h", 4: "i"}
+
+
+def rms(frame, sample_width):
+    """Root-mean-square energy of raw PCM (same scale as audioop.rms)."""
+    samples = array(_TYPECODES[sample_width], frame)
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+class MicrophoneSource:
+    """Long-lived microphone stream (opened once, read frame by frame)."""
+
+    def __init__(self, device_index=None):
+        self._mic = sr.Microphone(device_index=device_index)
+        self._mic.__enter__()
+        self.sample_rate = self._mic.SAMPLE_RATE
+        self.sample_width = self._mic.SAMPLE_WIDTH
+
+    def read(self, samples):
+        return self._mic.stream.read(samples)
+
+    def close(self):
+        self._mic.__exit__(None, None, None)
+
+
+class WavFileSource:
+    """Reads a mono WAV file like a microphone; returns None at the end.
+
+    With realtime=True reads are paced at the file's sample rate.
+    """
+
+    def __init__(self, path, realtime=False):
+        self._wav = wave.open(path, "rb")
+        if self._wav.getnchannels() != 1:
+            raise ValueError(f"{path}: seul le mono est supporté")
+        self.sample_rate = self._wav.getframerate()
+        self.sample_width = self._wav.getsampwidth()
+        self.realtime = realtime
+
+    def read(self, samples):
+        data = self._wav.readframes(samples)
+        if not data:
+            return None
+        if self.realtime:
+            time.sleep(samples / self.sample_rate)
+        return data
+
+    def close(self):
+        self._wav.close()
+
+
+class BackgroundListener:
+    """Continuous capture thread with energy-based voice activity detection.
+
+    Frames go through a ring buffer (the pre-roll kept before speech starts);
+    an utterance starts after a few frames above the energy threshold and
+    ends after pause_threshold seconds of silence or phrase_time_limit.
+    Complete utterances are queued as sr.AudioData. The threshold follows
+    the ambient noise while nobody speaks.
+
+    frame_hook (optional) sees the utterance while it is spoken:
+    start(sample_rate, sample_width), feed(frame) for each frame including
+    the pre-roll, end() (e.g. speculation.PartialTranscriber).
+
+    mute (optional threading.Event, e.g. AudioPlayer.speaking): while it is
+    set and for mute_tail seconds after, frames are dropped along with any
+    utterance being built, so the assistant doesn't hear itself speak.
+    """
+
+    def __init__(self, source, energy_threshold=300, frame_ms=30, pre_roll=0.3,
+                 pause_threshold=0.8, phrase_time_limit=10, min_phrase=0.25,
+                 dynamic_energy=True, damping=0.15, ratio=1.5, frame_hook=None,
+                 mute=None, mute_tail=0.3):
+        self.source = source
+        self.frame_hook = frame_hook
+        self.mute = mute
+        self.energy_threshold = energy_threshold
+        self.frame_samples = int(source.sample_rate * frame_ms / 1000)
+        self.frame_seconds = self.frame_samples / source.sample_rate
+        self.pause_frames = int(pause_threshold / self.frame_seconds)
+        self.max_frames = int(phrase_time_limit / self.frame_seconds)
+        self.min_frames = int(min_phrase / self.frame_seconds)
+        self.start_frames = 3 # consecutive loud frames needed to start an utterance
+        self.mute_tail_frames = int(mute_tail / self.frame_seconds)
+        self._muted_frames = 0 # frames still to drop after the mute was cleared
+        self.dynamic_energy = dynamic_energy
+        self.damping = damping
+        self.ratio = ratio
+
+        self._ring = deque(maxlen=max(1, int(pre_roll / self.frame_seconds)))
+        self.utterances = queue.Queue()
+        self.segments = [] # (start_s, end_s) of every utterance, for tests/metrics
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self.source.close()
+
+    def get(self, timeout=None):
+        """Returns the next utterance (sr.AudioData), or None on timeout or end of input."""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _adapt(self, energy):
+        # Same rule as sr.Recognizer's dynamic energy threshold
+        if not self.dynamic_energy:
+            return
+        damping = self.damping ** self.frame_seconds
+        target = energy * self.ratio
+        self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+
+    def _hook(self, method, *args):
+        if self.frame_hook:
+            try:
+                getattr(self.frame_hook, method)(*args)
+            except Exception as e:
+                print(f"Erreur écoute ({method}): {e}")
+
+    def _muted(self):
+        if self.mute is not None and self.mute.is_set():
+            self._muted_frames = self.mute_tail_frames
+            return True
+        if self._muted_frames:
+            self._muted_frames -= 1
+            return True
+        return False
+
+    def _emit(self, frames, start_frame, end_frame):
+        if len(frames) < self.min_frames:
+            return
+        data = b"".join(frames)
+        self.segments.append((start_frame * self.frame_seconds, end_frame * self.frame_seconds))
+        if HAS_SPEECH_RECOGNITION:
+            self.utterances.put(sr.AudioData(data, self.source.sample_rate, self.source.sample_width))
+        else:
+            self.utterances.put(data)
+
+    def _run(self):
+        width = self.source.sample_width
+        frame_index = 0
+        loud = 0
+        silent = 0
+        speech = None # frames of the current utterance
+        speech_start = 0
+
+        while not self._stop.is_set():
+            frame = self.source.read(self.frame_samples)
+            if frame is None:
+                break
+            if self._muted():
+                # Our own voice (and its echo): nothing is kept, not even the noise level
+                if speech is not None:
+                    self._hook("end")
+                    speech = None
+                self._ring.clear()
+                loud = 0
+                frame_index += 1
+                continue
+            energy = rms(frame, width)
+            is_loud = energy > self.energy_threshold
+
+            if speech is None:
+                self._ring.append(frame)
+                loud = loud + 1 if is_loud else 0
+                if loud >= self.start_frames:
+                    speech = list(self._ring)
+                    speech_start = frame_index - len(speech) + 1
+                    self._ring.clear()
+                    silent = 0
+                    self._hook("start", self.source.sample_rate, width)
+                    for pending in speech:
+                        self._hook("feed", pending)
+                elif not is_loud:
+                    self._adapt(energy)
+            else:
+                speech.append(frame)
+                self._hook("feed", frame)
+                silent = 0 if is_loud else silent + 1
+                if silent >= self.pause_frames or len(speech) >= self.max_frames:
+                    self._hook("end")
+                    self._emit(speech, speech_start, frame_index + 1)
+                    speech = None
+                    loud = 0
+            frame_index += 1
+
+        if speech:
+            self._hook("end")
+            self._emit(speech, speech_start, frame_index)
+        # End of input (e.g. WAV file): wake up a consumer blocked in get()
+        self.utterances.put(None)
+
+
+if __name__ == "__main__":
+    # python listener.py fichier.wav [...] -> prints the detected utterances
+    for path in sys.argv[1:]:
+        listener = BackgroundListener(WavFileSource(path)).start()
+        listener._thread.join()
+        for start, end in listener.segments:
+            print(f"{path}: parole {start:6.2f}s -> {end:6.2f}s")
+        print(f"{path}: seuil d'énergie final {listener.energy_threshold:.0f}")
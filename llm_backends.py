@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import queue
+import threading
+import http.client
+from urllib.parse import urlsplit
+from startup import timed_import
+
+
+class BackendHTTPError(Exception):
+    """HTTP error answer of an LLM API (retry_after: raw Retry-After header, if any)."""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GroqBackend:
+    """Groq cloud API (default)."""
+    name = "groq"
+
+    def __init__(self, api_key, model="llama-3.1-8b-instant"):
+        # Imported here: the groq SDK alone takes a few hundred ms to import
+        self._groq = timed_import("groq")
+        # Retries are handled by llm_client.ResilientBackend, not by the SDK
+        self.client = self._groq.Groq(api_key=api_key, max_retries=0)
+        self.model_name = model
+
+    def _create(self, **kwargs):
+        """chat.completions.create() with SDK errors mapped to BackendHTTPError/TimeoutError/ConnectionError."""
+        if kwargs.get("timeout") is None:
+            kwargs.pop("timeout", None) # None would disable the SDK default timeout
+        try:
+            return self.client.chat.completions.create(model=self.model_name, **kwargs)
+        except self._groq.APIStatusError as e:
+            raise BackendHTTPError(e.status_code, e.message, e.response.headers.get("retry-after")) from e
+        except self._groq.APITimeoutError as e:
+            raise TimeoutError(str(e)) from e
+        except self._groq.APIConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+    def complete(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        response = self._create(
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        return response.choices[0].message.content
+
+    def stream(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        """Yields the completion text chunk by chunk."""
+        response = self._create(
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            timeout=timeout,
+        )
+        for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def warm_up(self):
+        # Nothing to load on our side, the hosted model is always warm
+        pass
+
+
+class OllamaBackend:
+    """Ollama-compatible HTTP API (/api/chat) with a pool of keep-alive connections."""
+    name = "ollama"
+
+    def __init__(self, host="http://localhost:11434", model="llama3.1:8b",
+                 pool_size=4, timeout=30, keep_alive="30m"):
+        parts = urlsplit(host if "://" in host else f"http://{host}")
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self.host = f"{parts.scheme}://{parts.netloc}"
+        self.model_name = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self, timeout=None):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._conn_class(self._netloc, timeout=self.timeout)
+        # Per-call deadline: applies to the connect and to every read
+        conn.timeout = timeout or self.timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(conn.timeout)
+        return conn
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _post(self, path, payload, timeout=None):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        # A pooled connection may have been closed by the server: retry once on a fresh one
+        for attempt in range(2):
+            conn = self._acquire(timeout)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except TimeoutError:
+                conn.close()
+                raise # A slow server is not a stale connection, don't retry here
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status != 200:
+                raise BackendHTTPError(response.status, repr(data[:200]), response.getheader("Retry-After"))
+            return json.loads(data)
+
+    def _post_stream(self, path, payload, timeout=None):
+        """Yields the JSON lines of a streamed response (NDJSON)."""
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        conn = self._acquire(timeout)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+        except TimeoutError:
+            conn.close()
+            raise
+        except (http.client.HTTPException, ConnectionError, OSError):
+            # Stale pooled connection: retry once on a fresh one
+            conn.close()
+            conn = self._conn_class(self._netloc, timeout=timeout or self.timeout)
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+        if response.status != 200:
+            data = response.read()
+            conn.close()
+            raise BackendHTTPError(response.status, repr(data[:200]), response.getheader("Retry-After"))
+
+        finished = False
+        try:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+            finished = True
+        finally:
+            # Only a fully read response leaves the connection reusable
+            if finished and not response.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def complete(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        result = self._post("/api/chat", {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": False,
+            "format": "json",
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+        }, timeout)
+        return result["message"]["content"]
+
+    def stream(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        """Yields the completion text chunk by chunk."""
+        for part in self._post_stream("/api/chat", {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": True,
+            "format": "json",
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+        }, timeout):
+            content = part.get("message", {}).get("content")
+            if content:
+                yield content
+
+    def warm_up(self):
+        """Loads the model into memory (an empty prompt only triggers the load)."""
+        self._post("/api/generate", {"model": self.model_name, "prompt": "", "keep_alive": self.keep_alive})
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class StubBackend:
+    """Offline backend for benchmarks: answers after a fixed latency, no network."""
+    name = "stub"
+
+    def __init__(self, latency=0.0, answers=None):
+        self.latency = latency
+        self.answers = answers or {} # user text -> JSON answer
+        self.calls = 0
+
+    def complete(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        self.calls += 1
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("stub: délai dépassé")
+        time.sleep(self.latency)
+        return self.answers.get(messages[-1]["content"], '{"action": "unknown", "confidence": 0}')
+
+    def stream(self, messages, temperature=0.1, max_tokens=200, timeout=None):
+        yield self.complete(messages, temperature, max_tokens, timeout)
+
+    def warm_up(self):
+        pass
+
+
+def create_backend():
+    """Builds the backend selected by LLM_BACKEND (groq, ollama or stub). Returns None if unusable."""
+    name = os.getenv("LLM_BACKEND", "groq").lower()
+    if name == "stub":
+        return StubBackend(latency=float(os.getenv("LLM_STUB_LATENCY", "0")))
+    if name == "ollama":
+        return OllamaBackend(
+            host=os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+            model=os.getenv("OLLAMA_MODEL", "llama3.1:8b"),
+        )
+    if name != "groq":
+        print(f"ERREUR: LLM_BACKEND inconnu '{name}', utilisation de groq")
+
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        print("ERREUR: GROQ_API_KEY manquante dans .env")
+        return None
+    return GroqBackend(api_key, model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"))
+
+
+def warm_up_in_background(backend):
+    """Starts backend.warm_up() on a daemon thread so startup isn't blocked."""
+    def run():
+        try:
+            backend.warm_up()
+        except Exception as e:
+            print(f"Erreur préchargement modèle ({backend.name}): {e}")
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,198 @@
+import json
+import time
+import random
+import hashlib
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from llm_backends import BackendHTTPError
+
+
+class CircuitOpenError(Exception):
+    """The API is considered unhealthy: the call was not attempted."""
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) -> seconds, or None."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """429 and 5xx answers, timeouts and connection errors are worth retrying."""
+    if isinstance(error, BackendHTTPError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError, OSError))
+
+
+class CircuitBreaker:
+    """Opens after threshold consecutive failures, probes again after reset_timeout.
+
+    closed: calls go through. open: calls are refused until reset_timeout has
+    elapsed (or the Retry-After the server asked for). half-open: a single
+    probe call is let through; its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(self, threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = None
+        self._probing = False
+        self.opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._open_until is None:
+                return "closed"
+            return "open" if self.clock() < self._open_until else "half-open"
+
+    def allow(self):
+        with self._lock:
+            if self._open_until is None:
+                return True
+            if self.clock() < self._open_until or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._probing = False
+
+    def record_failure(self, open_for=None):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold or open_for:
+                if self._open_until is None or self._probing:
+                    self.opened += 1
+                self._open_until = self.clock() + max(open_for or 0.0, self.reset_timeout)
+                self._probing = False
+
+
+class ResilientBackend:
+    """Wraps an LLM backend with a deadline, retries, a circuit breaker and coalescing.
+
+    Every complete()/stream() call gets deadline seconds in total: each
+    attempt's timeout is what is left of it. 429/5xx answers, timeouts and
+    connection errors are retried with full-jitter exponential backoff, or
+    after Retry-After when the server sends one. While the breaker is open,
+    calls fail at once with CircuitOpenError so the caller can resolve the
+    command locally. Identical complete() calls in flight share one request.
+    """
+
+    def __init__(self, backend, deadline=4.0, max_retries=3, base_delay=0.2, max_delay=2.0, breaker=None):
+        self.backend = backend
+        self.name = backend.name
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._in_flight = {} # request key -> Future
+        self.counters = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+                         "coalesced": 0, "short_circuited": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call(self, attempt_fn):
+        """Runs attempt_fn(timeout) under the retry policy and the breaker."""
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise CircuitOpenError(f"API {self.name} indisponible (disjoncteur ouvert)")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.breaker.record_failure()
+                raise TimeoutError(f"Délai de {self.deadline:.1f} s dépassé")
+            self._count("attempts")
+            try:
+                result = attempt_fn(remaining)
+            except Exception as e:
+                if not is_retryable(e):
+                    # A bad request says nothing about the API's health
+                    self.breaker.record_success()
+                    raise
+                retry_after = parse_retry_after(getattr(e, "retry_after", None))
+                delay = self._backoff(attempt, retry_after)
+                left = deadline - time.monotonic()
+                # Asked to wait past our deadline: don't call again before then
+                self.breaker.record_failure(open_for=retry_after if retry_after and retry_after >= left else None)
+                attempt += 1
+                if attempt > self.max_retries or delay >= left:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def complete(self, messages, **kwargs):
+        key = hashlib.sha1(json.dumps([messages, kwargs], sort_keys=True).encode("utf-8")).hexdigest()
+        with self._lock:
+            self.counters["calls"] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._call(lambda timeout: self.backend.complete(messages, timeout=timeout, **kwargs))
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stream(self, messages, **kwargs):
+        """Streams the completion; only the wait for the first chunk is retried."""
+        self._count("calls")
+
+        def first_chunk(timeout):
+            chunks = iter(self.backend.stream(messages, timeout=timeout, **kwargs))
+            return next(chunks, ""), chunks
+
+        first, rest = self._call(first_chunk)
+        yield first
+        yield from rest
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["breaker"] = self.breaker.state
+        return stats
@@ -1,7 +1,14 @@
 import json
 import os
-from groq import Groq
+import time
 from dotenv import load_dotenv
+from llm_backends import create_backend, warm_up_in_background
+from llm_client import ResilientBackend, CircuitBreaker
+from intent_stream import consume_stream
+from intent_cache import IntentCache
+from paths import cache_dir
+from intent_model import IntentLog
+from tracing import traced
 
 load_dotenv()
 
@@ -22,16 +29,16 @@ Structure obligatoire :
 {
   "action": "...",
   "target": "...",
-  "platform": "...",
   "search": "...",
+  "platform": "...",
   "confidence": 0.0
 }
 
 Règles :
 - "action" = ce que l'utilisateur veut faire (open, play, search, write, close, quit, unknown)
 - "target" = application ou objet concerné (chrome, youtube, spotify, musique, site, fichier)
-- "platform" = youtube, google, local, spotify ou null
 - "search" = ce qu'il faut rechercher exactement
+- "platform" = youtube, google, local, spotify ou null
 - "confidence" = ton niveau de certitude entre 0 et 1
 
 Exemples :
@@ -41,8 +48,8 @@ Réponse:
 {
   "action": "open",
   "target": "firefox",
-  "platform": null,
   "search": null,
+  "platform": null,
   "confidence": 1.0
 }
 
@@ -51,8 +58,8 @@ Réponse:
 {
   "action": "search",
   "target": "google",
-  "platform": "google",
   "search": "chats",
+  "platform": "google",
   "confidence": 1.0
 }
 
@@ -61,8 +68,8 @@ Réponse:
 {
   "action": "play",
   "target": "youtube",
-  "platform": "youtube",
   "search": "Adriano",
+  "platform": "youtube",
   "confidence": 1.0
 }
 
@@ -71,48 +78,145 @@ Réponse:
 {
   "action": "quit",
   "target": null,
-  "platform": null,
   "search": null,
+  "platform": null,
   "confidence": 1.0
 }
 
+Si la phrase contient plusieurs actions, réponds avec la liste ordonnée des intentions.
+Ajoute "sequential": true à une intention qui doit attendre la fin des précédentes
+("puis", "ensuite", "après").
+
+Utilisateur: "Ouvre firefox et cherche la météo"
+Réponse:
+{
+  "intents": [
+    {"action": "open", "target": "firefox", "search": null, "platform": null, "confidence": 1.0},
+    {"action": "search", "target": "google", "search": "météo", "platform": "google", "confidence": 1.0}
+  ]
+}
+
 Si tu ne comprends pas clairement la demande :
 {
   "action": "unknown",
   "target": null,
-  "platform": null,
   "search": null,
+  "platform": null,
   "confidence": 0.2
 }
 """
 
 class LLMHandler:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            print("ERREUR: GROQ_API_KEY manquante dans .env")
-            self.client = None
-            return
-
-        self.client = Groq(api_key=api_key)
-        self.model_name = "llama-3.1-8b-instant"
-
-    def predict_intent(self, text):
-        if not self.client:
+    def __init__(self, use_cache=None, intent_log=None):
+        # Set INTENT_CACHE_DISABLE=1 (or use_cache=False) to always query the API
+        if use_cache is None:
+            use_cache = os.getenv("INTENT_CACHE_DISABLE", "0") != "1"
+        self.use_cache = use_cache
+        persist_path = None
+        if os.getenv("INTENT_CACHE_PERSIST", "0") == "1":
+            persist_path = os.path.join(cache_dir(), "intent_cache.json")
+        self.cache = IntentCache(
+            max_size=int(os.getenv("INTENT_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("INTENT_CACHE_TTL", str(24 * 3600))),
+            path=persist_path,
+        )
+
+        # Backend picked by LLM_BACKEND (groq or ollama), behind the retry/breaker layer
+        self.backend = create_backend()
+        if self.backend:
+            self.backend = ResilientBackend(
+                self.backend,
+                deadline=float(os.getenv("LLM_DEADLINE", "4")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+                breaker=CircuitBreaker(
+                    threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "3")),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+                ),
+            )
+        # LLM answers are the training set of the local intent model (intent_model.py);
+        # the stub backend's canned answers would only teach it the benchmarks.
+        # intent_log=False (benchmarks, tests) never writes the user's log.
+        if intent_log is None:
+            intent_log = os.getenv("INTENT_LOG", "1") == "1"
+        self.intent_log = None
+        if intent_log and self.backend and self.backend.name != "stub":
+            self.intent_log = IntentLog()
+        self.last_latency = None
+        self.last_stream_timings = None
+        if self.backend:
+            warm_up_in_background(self.backend)
+
+    def _log(self, text, intent):
+        if self.intent_log:
+            self.intent_log.add(text, intent)
+
+    @traced("predict_intent")
+    def predict_intent(self, text, use_cache=True, record=True):
+        """Intent dict for text; compound commands come back as {"intents": [...]}.
+
+        record=False (speculative lookups) neither logs nor caches the answer:
+        record_answer() does it once the answer is actually used.
+        """
+        use_cache = use_cache and self.use_cache
+        if use_cache:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+
+        intent = self._query_intent(text)
+        if record:
+            self.record_answer(text, intent, use_cache)
+        return intent
+
+    def record_answer(self, text, intent, use_cache=True):
+        """Logs an answer of the LLM for the intent model and caches it."""
+        self._log(text, intent)
+        if use_cache and self.use_cache:
+            self.cache.put(text, intent)
+
+    @traced("predict_intent_stream")
+    def predict_intent_stream(self, text, on_ready=None, use_cache=True):
+        """Streams the completion and calls on_ready(intent) as soon as it is dispatchable.
+
+        on_ready receives a partial intent (action + the fields it needs) before
+        the full answer arrives; the complete intent is returned at the end.
+        """
+        use_cache = use_cache and self.use_cache
+        if use_cache:
+            cached = self.cache.get(text)
+            if cached is not None:
+                if on_ready:
+                    on_ready(cached)
+                return cached
+
+        if not self.backend:
             return {"action": "error", "confidence": 0}
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": text},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=200,
-            )
-            content = response.choices[0].message.content
+            intent, self.last_stream_timings = consume_stream(
+                self.backend.stream(self._messages(text)), on_ready)
+            self.last_latency = self.last_stream_timings["full"]
+        except Exception as e:
+            print(f"Erreur LLM ({self.backend.name}): {e}")
+            return {"action": "error", "confidence": 0}
+        self._log(text, intent)
+        if use_cache:
+            self.cache.put(text, intent)
+        return intent
+
+    def _messages(self, text):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ]
+
+    def _query_intent(self, text):
+        if not self.backend:
+            return {"action": "error", "confidence": 0}
+        try:
+            start = time.perf_counter()
+            content = self.backend.complete(self._messages(text))
+            self.last_latency = time.perf_counter() - start
             return json.loads(content)
         except Exception as e:
-            print(f"Groq Error: {e}")
+            print(f"Erreur LLM ({self.backend.name}): {e}")
             return {"action": "error", "confidence": 0}
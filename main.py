@@ -1,13 +1,47 @@
-from assistant import Assistant
+import os
+from assistant import GREETING
+from client import open_assistant
 
 def main():
-    ai = Assistant()
-    ai.speak("Bonjour, je suis votre assistant. Que puis-je faire pour vous ?")
+    # Thin client of the daemon when it runs (ASSISTANT_DAEMON), local Assistant otherwise
+    ai = open_assistant()
+    # Only waits for the audio subsystem, the others keep starting meanwhile
+    ai.speak(GREETING)
+    if os.getenv("STARTUP_PROFILE", "0") == "1" and hasattr(ai, "startup_report"):
+        print(ai.startup_report())
     
     while ai.running:
         command = ai.listen()
-        if command:
+        if command == "latences":
+            # p50/p95/p99 of the traced stages (TRACE=1)
+            print(ai.latency_report())
+        elif command:
             ai.process_command(command)
 
+    all_stats = ai.stats()
+    stats, tts, audio = all_stats["intents"], all_stats["tts"], all_stats["audio"]
+    print(f"Premier son : {audio['avg_first_sound_ms']:.0f} ms en moyenne sur {audio['utterances']} phrases")
+    print(f"Voix en cache : {tts['hits']} succès ({tts['hit_ms']:.1f} ms), {tts['misses']} synthèses ({tts['miss_ms']:.0f} ms)")
+    print(f"Intentions résolues localement : {stats['local']}/{stats['local'] + stats['llm']} ({stats['local_ratio']:.0%})")
+    launcher = all_stats.get("launcher")
+    if launcher and launcher["apps"]:
+        spawn = ", ".join(f"{app} {s['p50']:.1f} ms" for app, s in launcher["apps"].items())
+        print(f"Lancements : {launcher['spawned']} démarrés, {launcher['reused']} réutilisés ({spawn})")
+    usage = all_stats.get("usage")
+    if usage and usage["lookups"]:
+        print(f"Applications habituelles : {usage['early_exits']}/{usage['lookups']} résolues d'avance "
+              f"({usage['resolution_saved_ms']:.0f} ms gagnées), {launcher['prewarmed_hits']} lancements préchargés "
+              f"({launcher['lookup_saved_ms']:.1f} ms gagnées)")
+    if all_stats.get("preprocess") and all_stats["preprocess"]["utterances"]:
+        pre = all_stats["preprocess"]
+        print(f"Prétraitement audio : {pre['size_ratio']:.0%} du volume d'origine envoyé, "
+              f"{pre['avg_ms']:.1f} ms par phrase, {pre['silent']} captures silencieuses ignorées")
+    if all_stats.get("speculation"):
+        speculation = all_stats["speculation"]
+        print(f"Spéculation : {speculation['hit_rate']:.0%} de réussite, {speculation['avg_saved_ms']:.0f} ms gagnées par réussite")
+    if all_stats.get("model"):
+        model = all_stats["model"]
+        print(f"Intentions résolues par le modèle : {model['hits']}/{model['hits'] + model['misses']}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import wave
+import random
+import tempfile
+import speech_recognition as sr
+
+# Usage: python make_fixtures.py [--force]
+# Synthesizes the audio fixtures of the benchmarks with the offline voice
+# (pyttsx3, a French eSpeak voice): 16 kHz mono clips with silence and room
+# noise around the speech, as the microphone captures them.
+#   fixtures/stt/*.wav + *.txt        bench_stt.py, bench_preprocess.py
+#   fixtures/wake_word/positive/*.wav bench_wake_word.py (wake word spoken)
+#   fixtures/wake_word/negative/*.wav bench_wake_word.py (other speech)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STT_DIR = os.path.join(FIXTURES_DIR, "stt")
+WAKE_WORD_DIR = os.path.join(FIXTURES_DIR, "wake_word")
+RATE = 16000
+
+STT_CLIPS = {
+    "ouvre_firefox": "ouvre firefox",
+    "lance_la_calculatrice": "lance la calculatrice",
+    "cherche_la_meteo": "cherche la météo à paris",
+    "joue_daft_punk": "joue daft punk",
+    "quelle_heure": "quelle heure est-il",
+    "ouvre_le_terminal": "ouvre le terminal",
+}
+WAKE_WORD_CLIPS = {
+    "positive": {
+        "assistant": "assistant",
+        "assistant_ouvre_firefox": "assistant ouvre firefox",
+        "assistant_quelle_heure": "assistant quelle heure est-il",
+    },
+    "negative": {
+        "meteo": "il fait beau aujourd'hui",
+        "rendez_vous": "on se retrouve à midi devant la gare",
+        "assistance": "le service d'assistance technique est fermé",
+        "commande": "ouvre la fenêtre s'il te plaît",
+    },
+}
+
+
+def _french_voice(engine):
+    for voice in engine.getProperty("voices"):
+        languages = [lang.decode(errors="ignore") if isinstance(lang, bytes) else str(lang)
+                     for lang in (voice.languages or [])]
+        if any("fr" in lang for lang in languages) or "fr" in voice.id.lower():
+            return voice.id
+    return None
+
+
+def _pad(pcm, rng, lead=0.8, tail=1.0, noise=60):
+    """16-bit PCM with silence and low room noise around it."""
+    samples = [int.from_bytes(pcm[i:i + 2], "little", signed=True) for i in range(0, len(pcm), 2)]
+    samples = [0] * int(lead * RATE) + samples + [0] * int(tail * RATE)
+    noisy = (max(-32768, min(32767, s + int(rng.gauss(0, noise)))) for s in samples)
+    return b"".join(s.to_bytes(2, "little", signed=True) for s in noisy)
+
+
+def synthesize(engine, text, path, rng):
+    with tempfile.TemporaryDirectory() as directory:
+        raw_path = os.path.join(directory, "raw.wav")
+        engine.save_to_file(text, raw_path)
+        engine.runAndWait()
+        with sr.AudioFile(raw_path) as source:
+            audio = sr.Recognizer().record(source)
+    pcm = audio.get_raw_data(convert_rate=RATE, convert_width=2)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(_pad(pcm, rng))
+
+
+if __name__ == "__main__":
+    force = "--force" in sys.argv
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+    except Exception as e:
+        print(f"Synthèse vocale hors ligne indisponible ({e}) : installez pyttsx3 et espeak-ng.")
+        sys.exit(1)
+    voice = _french_voice(engine)
+    if voice is None:
+        print("Aucune voix française trouvée (paquet espeak-ng-data ?).")
+        sys.exit(1)
+    engine.setProperty("voice", voice)
+    engine.setProperty("rate", 150)
+
+    rng = random.Random(12)
+    jobs = [(STT_DIR, STT_CLIPS, True)]
+    jobs += [(os.path.join(WAKE_WORD_DIR, kind), clips, False) for kind, clips in WAKE_WORD_CLIPS.items()]
+    written = 0
+    for directory, clips, transcripts in jobs:
+        os.makedirs(directory, exist_ok=True)
+        for name, text in clips.items():
+            wav_path = os.path.join(directory, name + ".wav")
+            if transcripts:
+                with open(os.path.join(directory, name + ".txt"), "w") as f:
+                    f.write(text + "\n")
+            if os.path.exists(wav_path) and not force:
+                continue
+            synthesize(engine, text, wav_path, rng)
+            written += 1
+    print(f"{written} clips écrits dans {FIXTURES_DIR}")
@@ -0,0 +1,19 @@
+import os
+
+APP_NAME = "ia_navigation"
+
+
+def cache_dir(*parts):
+    """Returns (and creates) a directory under the XDG cache dir for this app."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, APP_NAME, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def runtime_dir():
+    """Directory for sockets: $XDG_RUNTIME_DIR (per-user, tmpfs) or the cache dir."""
+    base = os.getenv("XDG_RUNTIME_DIR")
+    if base and os.path.isdir(base):
+        return base
+    return cache_dir()
@@ -0,0 +1,165 @@
+import os
+import json
+import speech_recognition as sr
+from text_normalize import normalize_text
+from tracing import traced
+from audio_preprocess import NoSpeech, create_preprocessor
+
+try:
+    import vosk
+    vosk.SetLogLevel(-1)
+    HAS_VOSK = True
+except ImportError:
+    HAS_VOSK = False
+
+
+class GoogleRecognizer:
+    """Google Web Speech API (network), the historical backend."""
+    name = "google"
+
+    def __init__(self, recognizer, language="fr-FR"):
+        self.recognizer = recognizer
+        self.language = language
+
+    @traced("recognize.google")
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class VoskStream:
+    """Incremental recognition session: feed raw 16 kHz mono PCM, read partials."""
+
+    def __init__(self, model, sample_rate=16000):
+        self._rec = vosk.KaldiRecognizer(model, sample_rate)
+        self._text = []
+
+    def feed(self, data):
+        """Returns the current partial hypothesis."""
+        if self._rec.AcceptWaveform(data):
+            text = json.loads(self._rec.Result()).get("text", "")
+            if text:
+                self._text.append(text)
+            return " ".join(self._text)
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join(self._text + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self._rec.FinalResult()).get("text", "")
+        if text:
+            self._text.append(text)
+        return " ".join(self._text)
+
+
+class VoskRecognizer:
+    """Offline recognizer (Vosk/Kaldi, CPU). The model is loaded once."""
+    name = "vosk"
+    sample_rate = 16000
+
+    def __init__(self, model_path):
+        if not HAS_VOSK:
+            raise RuntimeError("Module 'vosk' manquant")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Modèle Vosk introuvable: {model_path}")
+        self.model = vosk.Model(model_path)
+
+    def start_stream(self):
+        return VoskStream(self.model, self.sample_rate)
+
+    @traced("recognize.vosk")
+    def recognize(self, audio):
+        stream = self.start_stream()
+        stream.feed(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = stream.finish()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class PreprocessingRecognizer:
+    """Wraps a recognizer (the whole fallback chain) so that recognize() gets the utterance cleaned up first.
+
+    See audio_preprocess.AudioPreprocessor. The utterance is processed once,
+    whichever backend ends up transcribing it; a silent capture is rejected
+    without calling any. Other attributes (backends, start_stream...) are
+    the wrapped recognizer's.
+    """
+
+    def __init__(self, backend, preprocessor):
+        self.backend = backend
+        self.preprocessor = preprocessor
+        self.name = backend.name
+
+    def recognize(self, audio):
+        try:
+            audio = self.preprocessor.process(audio)
+        except NoSpeech:
+            raise sr.UnknownValueError()
+        return self.backend.recognize(audio)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+class FallbackRecognizer:
+    """Tries each backend in order until one returns a transcript."""
+
+    def __init__(self, backends):
+        self.backends = backends
+        self.name = "+".join(b.name for b in backends)
+
+    def recognize(self, audio):
+        error = sr.UnknownValueError()
+        for backend in self.backends:
+            try:
+                return backend.recognize(audio)
+            except sr.UnknownValueError as e:
+                error = e
+            except Exception as e:
+                print(f"Erreur reconnaissance ({backend.name}): {e}")
+                error = e if isinstance(e, sr.RequestError) else sr.RequestError(str(e))
+        raise error
+
+    def start_stream(self):
+        """Streaming session of the first backend that supports it, or None."""
+        for backend in self.backends:
+            if hasattr(backend, "start_stream"):
+                return backend.start_stream()
+        return None
+
+
+def create_backend(name, recognizer):
+    if name == "google":
+        return GoogleRecognizer(recognizer)
+    if name == "vosk":
+        return VoskRecognizer(os.path.expanduser(os.getenv("VOSK_MODEL_PATH", "~/.cache/vosk/vosk-model-small-fr-0.22")))
+    raise ValueError(f"Backend de reconnaissance inconnu: {name}")
+
+
+def create_recognizer(recognizer, names=None):
+    """Builds the fallback chain from STT_BACKENDS (e.g. "vosk,google")."""
+    names = names or [n.strip() for n in os.getenv("STT_BACKENDS", "google").split(",") if n.strip()]
+    backends = []
+    for name in names:
+        try:
+            backends.append(create_backend(name, recognizer))
+        except Exception as e:
+            print(f"Reconnaissance '{name}' indisponible: {e}")
+    if not backends:
+        backends.append(GoogleRecognizer(recognizer))
+    chain = FallbackRecognizer(backends)
+    # Every backend gets the trimmed 16 kHz utterance (AUDIO_PREPROCESS), processed once per utterance
+    preprocessor = create_preprocessor()
+    return PreprocessingRecognizer(chain, preprocessor) if preprocessor else chain
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = normalize_text(reference, strip_punctuation=True).split()
+    hyp = normalize_text(hypothesis, strip_punctuation=True).split()
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref) if ref else float(bool(hyp))
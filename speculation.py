@@ -0,0 +1,165 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from text_normalize import normalize_text
+
+# SPECULATIVE_INTENTS=1 (continuous listening with a streaming recognizer, e.g.
+# STT_BACKENDS=vosk,google): the intent is resolved from the partial transcript
+# while the user is still speaking, and reused if the final transcript matches.
+
+
+class SpeculativeResolver:
+    """Starts intent resolution on stable partial transcripts, ahead of the final one.
+
+    feed(partial) is called with each partial hypothesis of the current
+    utterance. Once the same hypothesis (of at least min_words words) has been
+    seen stable_feeds times in a row, resolve(text) starts in the background.
+    take(final) returns the speculated intent if one was started for the same
+    text (accents, case and punctuation ignored), or None; the speculations of
+    the utterance that don't match are cancelled (or their result discarded
+    if already running).
+
+    begin()/end() delimit utterances, so a speculation started for the next
+    utterance survives the take() of the previous one.
+
+    resolve must have no side effects (counters, logs): most speculations
+    are thrown away. commit(final, result), if given, applies them when
+    take() uses a result and returns the intent handed to the caller.
+    """
+
+    def __init__(self, resolve, stable_feeds=3, min_words=2, max_pending=2, executor=None,
+                 clock=time.perf_counter, commit=None):
+        self.resolve = resolve
+        self.commit = commit
+        self.stable_feeds = stable_feeds
+        self.min_words = min_words
+        self.max_pending = max_pending
+        self.clock = clock
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_pending, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._utterance = 0 # id of the utterance being spoken
+        self._closed = 0 # last utterance whose audio has ended
+        self._last = None
+        self._repeats = 0
+        self._speculations = {} # normalized text -> [future, utterance, started, done]
+        self.saved = [] # seconds gained on each hit
+        self.counters = {"started": 0, "hits": 0, "misses": 0, "cancelled": 0, "discarded": 0}
+
+    def begin(self):
+        """A new utterance starts."""
+        with self._lock:
+            self._utterance += 1
+            self._last = None
+            self._repeats = 0
+
+    def end(self):
+        """The audio of the current utterance has ended; its final transcript follows."""
+        with self._lock:
+            self._closed = self._utterance
+
+    def feed(self, partial):
+        """Partial hypothesis of the current utterance."""
+        text = normalize_text(partial or "", strip_punctuation=True)
+        with self._lock:
+            if text != self._last:
+                self._last = text
+                self._repeats = 1
+                return
+            self._repeats += 1
+            if (self._repeats != self.stable_feeds or len(text.split()) < self.min_words
+                    or text in self._speculations):
+                return
+            # Too many guesses in flight: the oldest one is the least likely
+            pending = [k for k, s in self._speculations.items() if s[1] == self._utterance]
+            if len(pending) >= self.max_pending:
+                self._drop(pending[0])
+            entry = [None, self._utterance, self.clock(), None]
+            self._speculations[text] = entry
+            self.counters["started"] += 1
+
+        def resolved(_):
+            entry[3] = self.clock()
+
+        future = self._executor.submit(self.resolve, text)
+        future.add_done_callback(resolved)
+        entry[0] = future
+
+    def _drop(self, text):
+        future = self._speculations.pop(text)[0]
+        if future is not None and future.cancel():
+            self.counters["cancelled"] += 1
+        else:
+            self.counters["discarded"] += 1
+
+    def take(self, final):
+        """Speculated intent for the final transcript, or None (resolve it normally)."""
+        now = self.clock()
+        text = normalize_text(final or "", strip_punctuation=True)
+        with self._lock:
+            entry = self._speculations.pop(text, None)
+            for other in [k for k, s in self._speculations.items() if s[1] <= self._closed]:
+                self._drop(other)
+            if entry is None or entry[0] is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+        future, _, started, _ = entry
+        try:
+            intent = future.result()
+            if self.commit:
+                intent = self.commit(final, intent)
+        except Exception:
+            return None
+        # Resolution time already elapsed when the final transcript arrived
+        done = entry[3] if entry[3] is not None else now
+        with self._lock:
+            self.saved.append(max(0.0, min(done, now) - started))
+        return intent
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            total = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / total if total else 0.0
+            stats["avg_saved_ms"] = sum(self.saved) / len(self.saved) * 1000 if self.saved else 0.0
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PartialTranscriber:
+    """BackgroundListener frame hook feeding a streaming recognizer and a SpeculativeResolver.
+
+    stream_factory() returns a session with feed(pcm_16k_mono) -> partial
+    text (recognizers.VoskStream); frames are converted to 16 kHz 16-bit
+    on the way.
+    """
+
+    def __init__(self, stream_factory, speculator, convert=None, sample_rate=16000):
+        self.stream_factory = stream_factory
+        self.speculator = speculator
+        self.convert = convert # (frame, rate, width) -> 16 kHz 16-bit PCM
+        self.sample_rate = sample_rate
+        self._stream = None
+        self._format = None
+
+    def start(self, sample_rate, sample_width):
+        self.speculator.begin()
+        self._format = (sample_rate, sample_width)
+        try:
+            self._stream = self.stream_factory()
+        except Exception as e:
+            print(f"Erreur transcription partielle: {e}")
+            self._stream = None
+
+    def feed(self, frame):
+        if self._stream is None:
+            return
+        if self.convert and self._format != (self.sample_rate, 2):
+            frame = self.convert(frame, *self._format)
+        self.speculator.feed(self._stream.feed(frame))
+
+    def end(self):
+        self._stream = None
+        self.speculator.end()
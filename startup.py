@@ -0,0 +1,107 @@
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Process start reference for the profile (module import time of this file)
+T0 = time.perf_counter()
+IMPORT_TIMES = {} # module name -> seconds
+_import_lock = threading.Lock()
+
+
+def timed_import(name):
+    """Imports a module and records how long it took (first import only)."""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _import_lock:
+        IMPORT_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+class Startup:
+    """Runs subsystem initializers concurrently on a background pool.
+
+    Each subsystem records when it started, how long it took and whether it
+    failed; wait(name) blocks until it is ready. Attributes declared with
+    Lazy() wait for their subsystem the first time they are read.
+    """
+
+    def __init__(self, max_workers=4, verbose=False):
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._futures = {}
+        self.timings = {} # name -> {"start", "duration", "error"}
+        self.created_at = time.perf_counter()
+
+    def start(self, name, fn):
+        def run():
+            start = time.perf_counter()
+            entry = {"start": start - self.created_at, "duration": None, "error": None}
+            self.timings[name] = entry
+            try:
+                return fn()
+            except Exception as e:
+                entry["error"] = str(e)
+                print(f"Erreur démarrage {name}: {e}")
+                raise
+            finally:
+                entry["duration"] = time.perf_counter() - start
+                if self.verbose:
+                    print(f"[démarrage] {name} prêt en {entry['duration'] * 1000:.0f} ms")
+        self._futures[name] = self._executor.submit(run)
+        return self._futures[name]
+
+    def wait(self, name, timeout=None):
+        return self._futures[name].result(timeout=timeout)
+
+    def ready(self, name):
+        future = self._futures.get(name)
+        return future is not None and future.done()
+
+    def wait_all(self, timeout=None):
+        for name in list(self._futures):
+            try:
+                self.wait(name, timeout)
+            except Exception:
+                pass
+
+    def report(self):
+        """Startup profile: import times and per-subsystem init times."""
+        lines = ["Profil de démarrage :"]
+        for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]):
+            lines.append(f"  import {name:<22} {seconds * 1000:7.0f} ms")
+        for name, entry in self.timings.items():
+            if entry["duration"] is None:
+                status = "en cours"
+            else:
+                status = f"{entry['duration'] * 1000:7.0f} ms" + (" (erreur)" if entry["error"] else "")
+            lines.append(f"  init   {name:<22} {status} (démarré à +{entry['start'] * 1000:.0f} ms)")
+        lines.append(f"  total depuis le lancement : {(time.perf_counter() - T0) * 1000:.0f} ms")
+        return "\n".join(lines)
+
+
+class Lazy:
+    """Attribute filled by a startup subsystem; reading it waits for that subsystem.
+
+    The subsystem's own initializer must not read it (it would wait on itself):
+    it builds locals and assigns the attributes at the end.
+    """
+
+    def __init__(self, subsystem):
+        self.subsystem = subsystem
+
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if not obj.startup.ready(self.subsystem):
+            try:
+                obj.startup.wait(self.subsystem)
+            except Exception:
+                pass
+        return obj.__dict__.get(self.attr)
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
@@ -0,0 +1,151 @@
+import sys
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from llm_backends import OllamaBackend, BackendHTTPError
+from llm_client import ResilientBackend, CircuitBreaker, CircuitOpenError
+
+# Usage: python test_llm_client.py
+# Runs the retry/backoff, deadline, circuit breaker and coalescing logic
+# against a local Ollama-compatible server that injects latency and errors.
+
+
+class FaultyHandler(BaseHTTPRequestHandler):
+    """Answers /api/chat following a script of faults: ("ok",), ("delay", s), ("status", code, retry_after)."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    script = deque()
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with FaultyHandler.lock:
+            FaultyHandler.requests += 1
+            fault = FaultyHandler.script.popleft() if FaultyHandler.script else ("ok",)
+        if fault[0] == "delay":
+            time.sleep(fault[1])
+        if fault[0] == "status":
+            data = json.dumps({"error": "injected"}).encode("utf-8")
+            self.send_response(fault[1])
+            if fault[2] is not None:
+                self.send_header("Retry-After", str(fault[2]))
+        else:
+            content = json.dumps({"action": "open", "target": "firefox", "confidence": 1.0})
+            data = json.dumps({"message": {"role": "assistant", "content": content}, "done": True}).encode("utf-8")
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass # The client gave up (deadline test)
+
+    def log_message(self, *args):
+        pass
+
+
+def reset(*faults):
+    FaultyHandler.script = deque(faults)
+    FaultyHandler.requests = 0
+
+
+def client(**kwargs):
+    breaker = kwargs.pop("breaker", None) or CircuitBreaker(threshold=3, reset_timeout=0.5)
+    return ResilientBackend(OllamaBackend(host=HOST, pool_size=8), breaker=breaker, **kwargs)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        result = e
+    return result, time.perf_counter() - start
+
+
+MESSAGES = [{"role": "user", "content": "ouvre firefox"}]
+failures = []
+
+
+def check(name, condition, detail):
+    print(f"{'OK   ' if condition else 'ÉCHEC'} {name}: {detail}")
+    if not condition:
+        failures.append(name)
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FaultyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    HOST = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # 429 with Retry-After: waits what the server asked, then succeeds
+    reset(("status", 429, 0.3))
+    c = client()
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("429 + Retry-After", isinstance(result, str) and 0.3 <= elapsed < 0.6 and FaultyHandler.requests == 2,
+          f"{elapsed * 1000:.0f} ms, {FaultyHandler.requests} requêtes")
+
+    # 5xx: jittered exponential backoff, success on the third attempt
+    reset(("status", 500, None), ("status", 503, None))
+    c = client(base_delay=0.05)
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("5xx puis succès", isinstance(result, str) and c.stats()["retries"] == 2,
+          f"{elapsed * 1000:.0f} ms, {c.stats()['retries']} nouvelles tentatives")
+
+    # 400: not retried, not counted against the API
+    reset(("status", 400, None))
+    c = client()
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("400 sans nouvelle tentative", isinstance(result, BackendHTTPError) and FaultyHandler.requests == 1
+          and c.breaker.state == "closed", f"{FaultyHandler.requests} requête, disjoncteur {c.breaker.state}")
+
+    # Slow server: the call gives up at the deadline instead of the socket timeout
+    reset(("delay", 2.0), ("delay", 2.0))
+    c = client(deadline=0.5)
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("délai global", isinstance(result, (TimeoutError, OSError)) and elapsed < 0.8,
+          f"{type(result).__name__} après {elapsed * 1000:.0f} ms")
+
+    # Retry-After beyond the deadline: fail now and keep the circuit open meanwhile
+    reset(("status", 429, 5))
+    c = client(deadline=1.0)
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("Retry-After > délai", isinstance(result, BackendHTTPError) and elapsed < 0.2 and c.breaker.state == "open",
+          f"{elapsed * 1000:.0f} ms, disjoncteur {c.breaker.state}")
+
+    # Breaker: opens after repeated failures, short-circuits, then recovers through a probe
+    reset(*[("status", 503, None)] * 3)
+    c = client(max_retries=0)
+    for _ in range(3):
+        timed(lambda: c.complete(MESSAGES))
+    sent = FaultyHandler.requests
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("disjoncteur ouvert", isinstance(result, CircuitOpenError) and FaultyHandler.requests == sent and elapsed < 0.01,
+          f"refus en {elapsed * 1e6:.0f} µs, aucune requête envoyée")
+    time.sleep(0.6)
+    result, elapsed = timed(lambda: c.complete(MESSAGES))
+    check("sonde après reset_timeout", isinstance(result, str) and c.breaker.state == "closed",
+          f"disjoncteur {c.breaker.state}")
+
+    # Coalescing: identical utterances in flight share one request
+    reset(("delay", 0.3))
+    c = client()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(c.complete(MESSAGES))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("regroupement", len(results) == 5 and FaultyHandler.requests == 1 and c.stats()["coalesced"] == 4,
+          f"5 appels, {FaultyHandler.requests} requête")
+
+    server.shutdown()
+    print("SUCCESS" if not failures else f"FAILURE: {', '.join(failures)}")
+    sys.exit(1 if failures else 0)
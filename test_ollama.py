@@ -1,16 +1,96 @@
-from llm_handler import LLMHandler
+import os
+import sys
+import json
 import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Usage: python test_ollama.py          -> real Ollama server (OLLAMA_HOST)
+#        python test_ollama.py --stub   -> local stub server, no model needed
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal Ollama-compatible server answering /api/generate and /api/chat."""
+    protocol_version = "HTTP/1.1" # keep-alive
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        StubOllamaHandler.connections += 1
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/generate":
+            body = {"model": payload["model"], "response": "", "done": True}
+        else:
+            text = payload["messages"][-1]["content"]
+            target = text.split()[-1] if text.split() else None
+            intent = {"action": "open", "target": target, "platform": None, "search": None, "confidence": 1.0}
+            if payload.get("stream"):
+                return self._stream_chat(payload["model"], json.dumps(intent))
+            body = {"model": payload["model"], "message": {"role": "assistant", "content": json.dumps(intent)}, "done": True}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_chat(self, model, content):
+        # NDJSON lines sent with chunked transfer encoding, a few characters each
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parts = [content[i:i + 4] for i in range(0, len(content), 4)]
+        for i, part in enumerate(parts + [""]):
+            line = json.dumps({"model": model, "message": {"role": "assistant", "content": part},
+                               "done": i == len(parts)}).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+if "--stub" in sys.argv:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+os.environ["LLM_BACKEND"] = "ollama"
+os.environ["INTENT_CACHE_DISABLE"] = "1"
+# Test answers (canned with --stub) must not train the local intent model
+os.environ["INTENT_LOG"] = "0"
+
+from llm_handler import LLMHandler
 
 print("Testing Ollama integration...")
 llm = LLMHandler()
+
 start = time.time()
-response = llm.predict_intent("ouvre firefox")
-end = time.time()
+llm.backend.warm_up()
+print(f"Warm-up: {time.time() - start:.2f}s")
 
-print(f"Response: {response}")
-print(f"Time taken: {end - start:.2f}s")
+for command in ["ouvre firefox", "ouvre firefox", "ouvre firefox"]:
+    start = time.time()
+    response = llm.predict_intent(command)
+    end = time.time()
+
+    print(f"Response: {response}")
+    print(f"Time taken: {end - start:.2f}s")
+
+start = time.time()
+response = llm.predict_intent_stream("ouvre firefox")
+end = time.time()
+print(f"Response (stream): {response}")
+print(f"Time taken: {end - start:.2f}s (première action {llm.last_stream_timings['first_action']:.2f}s)")
 
 if response.get("action") == "open" and "firefox" in str(response.get("target")).lower():
     print("SUCCESS: Intent correctly identified.")
 else:
     print("FAILURE: Intent not identified correctly.")
+
+if "--stub" in sys.argv:
+    print(f"Connexions HTTP ouvertes : {StubOllamaHandler.connections} (pool keep-alive)")
@@ -0,0 +1,163 @@
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+from speculation import SpeculativeResolver, PartialTranscriber
+
+# Usage: python test_speculation.py
+# Replays scripted partial-transcript sequences (one partial per 30 ms audio
+# frame, as the listener feeds them) through the speculative resolver, then
+# through the assistant's command path with an LLM stub, and reports the hit
+# rate and the latency saved.
+
+FRAME = 0.03
+RESOLVE_LATENCY = 0.3
+
+
+class ScriptedStream:
+    """Stands in for VoskStream: returns the next scripted partial on each feed()."""
+
+    def __init__(self, partials):
+        self.partials = list(partials)
+
+    def feed(self, frame):
+        return self.partials.pop(0) if len(self.partials) > 1 else self.partials[0]
+
+
+class SlowResolver:
+    def __init__(self, latency=RESOLVE_LATENCY):
+        self.latency = latency
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        time.sleep(self.latency)
+        return {"action": "open", "target": text.split()[-1], "confidence": 1.0}
+
+
+def speak(speculator, partials, pace=0.0, end=True):
+    """Plays one utterance through the listener's frame hook: one frame per partial."""
+    hook = PartialTranscriber(lambda: ScriptedStream(partials), speculator)
+    hook.start(16000, 2)
+    for _ in partials:
+        hook.feed(b"\0\0" * 480)
+        time.sleep(pace)
+    if end:
+        hook.end()
+    return hook
+
+
+def repeat(text, frames):
+    return [text] * frames
+
+
+failures = []
+
+
+def check(name, condition, detail):
+    print(f"{'OK   ' if condition else 'ÉCHEC'} {name}: {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def scripted_cases():
+    # Stable partial equal to the final transcript: resolved once, ahead of time
+    resolver = SlowResolver()
+    speculator = SpeculativeResolver(resolver)
+    speak(speculator, ["ouvre"] * 2 + repeat("ouvre firefox", 10) + ["ouvre firefox"], pace=FRAME)
+    start = time.perf_counter()
+    intent = speculator.take("Ouvre Firefox.")
+    waited = time.perf_counter() - start
+    check("partielle = finale", intent and intent["target"] == "firefox" and resolver.calls == ["ouvre firefox"]
+          and waited < RESOLVE_LATENCY, f"attente {waited * 1000:.0f} ms au lieu de {RESOLVE_LATENCY * 1000:.0f}")
+
+    # The hypothesis changes before the end: the speculation is dropped, not reused
+    resolver = SlowResolver(0.05)
+    speculator = SpeculativeResolver(resolver)
+    speak(speculator, repeat("ouvre fire", 4) + ["ouvre firefox"])
+    intent = speculator.take("ouvre firefox")
+    check("divergence", intent is None and speculator.stats()["misses"] == 1,
+          f"{speculator.stats()['started']} spéculation, ignorée")
+
+    # Hypotheses that keep changing never start a lookup
+    resolver = SlowResolver(0.05)
+    speculator = SpeculativeResolver(resolver)
+    speak(speculator, ["cherche", "cherche la", "cherche la mé", "cherche la météo", "cherche la météo à", "cherche la météo à paris"])
+    check("partielles instables", not resolver.calls and speculator.take("cherche la météo à paris") is None,
+          "aucune requête")
+
+    # An earlier stable hypothesis matches the final one ("euh" dropped by the recognizer)
+    resolver = SlowResolver(0.05)
+    speculator = SpeculativeResolver(resolver)
+    speak(speculator, repeat("lance gedit", 4) + repeat("lance gedit euh", 4))
+    intent = speculator.take("lance gedit")
+    check("hypothèse antérieure", intent is not None and speculator.stats()["discarded"]
+          + speculator.stats()["cancelled"] == 1, f"{len(resolver.calls)} spéculations, 1 réutilisée")
+
+    # The next utterance's speculation survives the take() of the previous one
+    resolver = SlowResolver(0.05)
+    speculator = SpeculativeResolver(resolver)
+    speak(speculator, repeat("ouvre firefox", 4))
+    hook = speak(speculator, repeat("joue daft punk", 4), end=False)
+    speculator.take("ouvre le terminal")
+    hook.end()
+    intent = speculator.take("joue daft punk")
+    check("énoncés successifs", intent is not None, "la spéculation suivante est conservée")
+
+
+def assistant_cases():
+    # Whole command path: partials while speaking, then the final transcript to process_command
+    os.environ["LLM_BACKEND"] = "stub"
+    os.environ["LLM_STUB_LATENCY"] = str(RESOLVE_LATENCY)
+    from batch import BatchAssistant, RecordingSink
+    commands = [
+        (repeat("mets la radio", 12), "mets la radio"),
+        (repeat("écris une lettre", 12), "écris une lettre"),
+        (repeat("ouvre le", 12) + repeat("ouvre le navigateur", 2), "ouvre le navigateur web"),
+    ]
+    assistant = BatchAssistant(RecordingSink())
+    assistant.startup.wait_all()
+    # Every command reaches the (stub) LLM
+    assistant.intent_model = None
+    assistant.intent_rules.threshold = 2.0
+    answers = {final: json.dumps(assistant.intent_rules.classify(final)) for _, final in commands}
+    assistant.llm.backend.backend.answers = answers
+
+    timings = {}
+    for label, speculate in (("sans spéculation", False), ("avec spéculation", True)):
+        assistant.speculator = SpeculativeResolver(
+            assistant.speculate_intent, commit=assistant.commit_speculation) if speculate else None
+        elapsed = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for partials, final in commands:
+                if speculate:
+                    speak(assistant.speculator, partials, pace=FRAME)
+                else:
+                    time.sleep(FRAME * len(partials))
+                start = time.perf_counter()
+                assistant.process_command(final)
+                elapsed.append(time.perf_counter() - start)
+        timings[label] = elapsed
+    stats = assistant.speculator.stats()
+    rules = assistant.intent_rules.stats()
+    assistant.close()
+
+    for label, elapsed in timings.items():
+        print(f"  {label:<18} " + " | ".join(f"{e * 1000:5.0f} ms" for e in elapsed))
+    print(f"  taux de réussite {stats['hit_rate']:.0%}, gain moyen {stats['avg_saved_ms']:.0f} ms par réussite")
+    check("chemin complet", stats["hits"] == 2 and stats["misses"] == 1
+          and timings["avec spéculation"][0] < timings["sans spéculation"][0] - RESOLVE_LATENCY / 2,
+          f"{stats['hits']} réussites, {stats['misses']} échec")
+    # Speculations on partials don't count: one rule lookup per processed command
+    lookups = rules["local"] + rules["llm"]
+    check("sans effets de bord", lookups == 2 * len(commands),
+          f"{lookups} consultations des règles pour {2 * len(commands)} commandes")
+
+
+if __name__ == "__main__":
+    scripted_cases()
+    assistant_cases()
+    print("SUCCESS" if not failures else f"FAILURE: {', '.join(failures)}")
+    sys.exit(1 if failures else 0)
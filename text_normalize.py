@@ -0,0 +1,19 @@
+import re
+import unicodedata
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def fold_accents(text):
+    """Removes diacritics ("éditeur" -> "editeur")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_text(text, strip_punctuation=False):
+    """Lowercases, folds accents and collapses whitespace (optionally drops punctuation)."""
+    text = fold_accents(text or "").lower()
+    if strip_punctuation:
+        text = _PUNCTUATION_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
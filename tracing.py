@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+from paths import cache_dir
+
+# TRACE=1 turns tracing on: each command produces a span tree written as one
+# JSON line to TRACE_FILE (default ~/.cache/ia_navigation/traces.jsonl) and
+# every span duration feeds an in-memory histogram per span name. Disabled,
+# span() returns a shared no-op object and traced() adds a single check.
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of a list of numbers."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in points}
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "children", "start", "wall", "duration")
+
+    def __init__(self, tracer, name, parent, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        if self.parent is not None:
+            self.parent.children.append(self)
+        self.tracer._stack().append(self)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._stack().pop()
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "start": round(self.wall, 6),
+            "ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            **({"attrs": self.attrs} if self.attrs else {}),
+            **({"children": [child.to_dict() for child in self.children]} if self.children else {}),
+        }
+
+
+class _Attached:
+    """Makes parent the current span of this thread (no timing of its own)."""
+
+    def __init__(self, tracer, parent):
+        self.tracer = tracer
+        self.parent = parent
+
+    def __enter__(self):
+        self.tracer._stack().append(self.parent)
+
+    def __exit__(self, *exc):
+        self.tracer._stack().pop()
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled=False, path=None, max_samples=2048):
+        self.enabled = enabled
+        self.path = path
+        self.max_samples = max_samples
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._samples = {} # span name -> deque of seconds
+        self._file = None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, name, parent=None, **attrs):
+        """Context manager timing a span, child of parent or of this thread's current span."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, parent if parent is not None else self.current(), attrs)
+
+    def bind(self, fn):
+        """Wraps fn so that, run on another thread, its spans attach to the current span."""
+        parent = self.current()
+        if parent is None:
+            return fn
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with _Attached(self, parent):
+                return fn(*args, **kwargs)
+        return run
+
+    def _finish(self, span):
+        with self._lock:
+            samples = self._samples.get(span.name)
+            if samples is None:
+                samples = self._samples[span.name] = deque(maxlen=self.max_samples)
+            samples.append(span.duration)
+            if span.parent is None and self.path:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+
+    def histograms(self):
+        """{span name: {"count", "p50", "p95", "p99"}} in milliseconds."""
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+        stats = {}
+        for name, samples in snapshot.items():
+            stats[name] = {"count": len(samples)}
+            stats[name].update({key: value * 1000 for key, value in percentiles(samples).items()})
+        return stats
+
+    def report(self):
+        if not self.enabled:
+            return "Traçage désactivé (TRACE=1 pour l'activer)."
+        lines = [f"{'span':<22} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+        for name, stats in sorted(self.histograms().items()):
+            lines.append(f"{name:<22} {stats['count']:>5} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def _default_tracer():
+    enabled = os.getenv("TRACE", "0") == "1"
+    path = os.path.expanduser(os.getenv("TRACE_FILE", "")) or (os.path.join(cache_dir(), "traces.jsonl") if enabled else None)
+    return Tracer(enabled=enabled, path=path)
+
+
+tracer = _default_tracer()
+
+
+def span(name, parent=None, **attrs):
+    return tracer.span(name, parent, **attrs)
+
+
+def traced(name):
+    """Decorator running the function inside a span (a plain call when tracing is off)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
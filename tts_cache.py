@@ -0,0 +1,132 @@
+import io
+import os
+import time
+import hashlib
+import threading
+from paths import cache_dir
+
+
+class TTSCache:
+    """Content-addressed cache of synthesized speech (mp3), capped in size with LRU eviction.
+
+    Entries are named after a hash of text + lang + voice; the file mtime is
+    refreshed on every hit and serves as the LRU clock.
+    """
+
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024):
+        self.directory = directory or cache_dir("tts")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {} # path -> size
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_time = 0.0
+        self._miss_time = 0.0
+        for name in os.listdir(self.directory):
+            if name.endswith(".mp3"):
+                path = os.path.join(self.directory, name)
+                size = os.path.getsize(path)
+                self._entries[path] = size
+                self._total += size
+
+    def path_for(self, text, lang="fr", voice="gtts"):
+        digest = hashlib.sha256(f"{lang}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.mp3")
+
+    def get(self, text, lang="fr", voice="gtts"):
+        """Returns the cached file path or None."""
+        path = self.path_for(text, lang, voice)
+        with self._lock:
+            if path not in self._entries:
+                return None
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(path, 0)
+            return None
+        return path
+
+    def get_or_create(self, text, synthesize, lang="fr", voice="gtts"):
+        """Returns the audio bytes for text, calling synthesize(fp) on a miss."""
+        start = time.perf_counter()
+        path = self.get(text, lang, voice)
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                with self._lock:
+                    self.hits += 1
+                    self._hit_time += time.perf_counter() - start
+                return data
+            except OSError:
+                pass
+
+        # Synthesize in memory; the file is only written for the next runs
+        buffer = io.BytesIO()
+        synthesize(buffer)
+        data = buffer.getvalue()
+        path = self.path_for(text, lang, voice)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Erreur écriture cache voix: {e}")
+            with self._lock:
+                self.misses += 1
+                self._miss_time += time.perf_counter() - start
+            return data
+        size = len(data)
+        with self._lock:
+            self._total += size - self._entries.get(path, 0)
+            self._entries[path] = size
+            self.misses += 1
+            self._miss_time += time.perf_counter() - start
+        self._evict(keep=path)
+        return data
+
+    def _evict(self, keep=None):
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            by_age = sorted(self._entries, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for path in by_age:
+                if self._total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._total -= self._entries.pop(path)
+                self.evictions += 1
+
+    def prewarm(self, texts, synthesize_for):
+        """Synthesizes missing phrases on a background thread. synthesize_for(text) -> synthesize(fp)."""
+        def run():
+            for text in texts:
+                if self.get(text) is None:
+                    try:
+                        self.get_or_create(text, synthesize_for(text))
+                    except Exception as e:
+                        print(f"Erreur préchargement voix: {e}")
+                        return
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ms": self._hit_time * 1000 / self.hits if self.hits else 0.0,
+            "miss_ms": self._miss_time * 1000 / self.misses if self.misses else 0.0,
+        }
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import threading
+from paths import cache_dir
+from text_normalize import normalize_text
+
+# Usage: python usage.py   -> most used apps (decayed counts) and learned queries
+# Every app the assistant opens is counted in ~/.cache/ia_navigation/usage.json;
+# counts halve every USAGE_HALF_LIFE_DAYS days (7). USAGE_TRACKING=0 keeps them in
+# memory only, for the current session.
+
+VERSION = 1
+
+
+class UsageStore:
+    """Persistent, exponentially decaying usage counts of apps and of the queries naming them.
+
+    AppIndex uses it two ways: a query whose decayed count for the same app
+    reaches min_uses (by default: said twice lately) skips the fuzzy scoring
+    (early exit), and equal fuzzy scores are broken in favour of the most
+    used app. top() drives the pre-warming of the likely next launches.
+    """
+
+    def __init__(self, path=None, half_life_days=7.0, min_uses=1.5, max_queries=500, clock=time.time):
+        self.path = path
+        self.half_life = half_life_days * 86400
+        self.min_uses = min_uses
+        self.max_queries = max_queries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._apps = {} # alias -> [count, updated_at]
+        self._queries = {} # folded query -> [alias, match score, count, updated_at]
+        self.counters = {"lookups": 0, "early_exits": 0, "tie_breaks": 0}
+        self._timings = {"full": [0, 0.0], "early": [0, 0.0]} # kind -> [lookups, seconds]
+        if self.path:
+            self._load()
+
+    def _decayed(self, count, updated_at, now):
+        return count * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == VERSION:
+            self._apps = data.get("apps", {})
+            self._queries = data.get("queries", {})
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": VERSION, "apps": self._apps, "queries": self._queries},
+                          f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Erreur écriture usage: {e}")
+
+    def record(self, alias, query=None, score=None):
+        """Counts one launch of alias, resolved from query with the given match score."""
+        now = self.clock()
+        with self._lock:
+            count, updated_at = self._apps.get(alias, (0.0, now))
+            self._apps[alias] = [self._decayed(count, updated_at, now) + 1, now]
+            if query:
+                key = normalize_text(query)
+                previous = self._queries.get(key)
+                count = 0.0
+                if previous and previous[0] == alias:
+                    count = self._decayed(previous[2], previous[3], now)
+                self._queries[key] = [alias, score if score is not None else 100, count + 1, now]
+                if len(self._queries) > self.max_queries:
+                    weakest = min(self._queries, key=lambda k: self._decayed(*self._queries[k][2:], now))
+                    del self._queries[weakest]
+            self._save()
+
+    def weight(self, alias):
+        """Decayed launch count of alias (0 if never opened)."""
+        entry = self._apps.get(alias)
+        return self._decayed(entry[0], entry[1], self.clock()) if entry else 0.0
+
+    def resolved(self, folded_query):
+        """(alias, score) this query was resolved to often enough to skip matching, or None."""
+        entry = self._queries.get(folded_query)
+        if entry is None or self._decayed(entry[2], entry[3], self.clock()) < self.min_uses:
+            return None
+        return entry[0], entry[1]
+
+    def top(self, n=5):
+        """The n most used aliases, most used first."""
+        now = self.clock()
+        with self._lock:
+            ranked = sorted(self._apps, key=lambda a: self._decayed(*self._apps[a], now), reverse=True)
+        return ranked[:n]
+
+    def note_lookup(self, early, seconds, tie_break=False):
+        """Timing of one AppIndex lookup (early exit or full fuzzy scoring)."""
+        with self._lock:
+            self.counters["lookups"] += 1
+            self.counters["early_exits"] += early
+            self.counters["tie_breaks"] += tie_break
+            timing = self._timings["early" if early else "full"]
+            timing[0] += 1
+            timing[1] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            full_count, full_time = self._timings["full"]
+            early_count, early_time = self._timings["early"]
+        stats["hit_rate"] = stats["early_exits"] / stats["lookups"] if stats["lookups"] else 0.0
+        full_ms = full_time * 1000 / full_count if full_count else 0.0
+        early_ms = early_time * 1000 / early_count if early_count else 0.0
+        stats["full_match_ms"] = full_ms
+        # What the early exits would have cost with full matching
+        stats["resolution_saved_ms"] = max(0.0, full_ms - early_ms) * early_count
+        stats["top"] = self.top()
+        return stats
+
+
+def open_store():
+    """The assistant's store (USAGE_TRACKING=0: in memory only, nothing persisted)."""
+    path = None
+    if os.getenv("USAGE_TRACKING", "1") == "1":
+        path = os.path.join(cache_dir(), "usage.json")
+    return UsageStore(path, half_life_days=float(os.getenv("USAGE_HALF_LIFE_DAYS", "7")))
+
+
+if __name__ == "__main__":
+    store = open_store()
+    now = store.clock()
+    print("Applications les plus utilisées :")
+    for alias in store.top(10):
+        print(f"  {alias:<30} {store.weight(alias):6.2f}")
+    print("Requêtes apprises :")
+    for query, (alias, score, count, updated_at) in sorted(
+            store._queries.items(), key=lambda item: -store._decayed(item[1][2], item[1][3], now))[:10]:
+        print(f"  {query!r:<30} -> {alias} ({store._decayed(count, updated_at, now):.2f})")
@@ -0,0 +1,96 @@
+import json
+import time
+from text_normalize import normalize_text
+
+try:
+    import vosk
+    HAS_VOSK = True
+except ImportError:
+    HAS_VOSK = False
+
+
+class VoskKeywordSpotter:
+    """Keyword spotting with a Vosk recognizer restricted to the wake words.
+
+    A grammar of a few words is much cheaper to decode than free speech, so
+    background chatter is rejected locally without running the full recognizer.
+    """
+    name = "vosk-kws"
+
+    def __init__(self, model, wake_words, sample_rate=16000):
+        self.model = model
+        self.wake_words = [normalize_text(w) for w in wake_words]
+        self.sample_rate = sample_rate
+        # The grammar takes the words as the model spells them ("écoute", not "ecoute")
+        self._grammar = json.dumps([w.strip().lower() for w in wake_words] + ["[unk]"], ensure_ascii=False)
+
+    def detect(self, audio):
+        rec = vosk.KaldiRecognizer(self.model, self.sample_rate, self._grammar)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = normalize_text(json.loads(rec.FinalResult()).get("text", ""))
+        return any(w in text.split() for w in self.wake_words)
+
+
+def create_spotter(stt, wake_words):
+    """Spotter on the Vosk model of the recognition chain, or None without one.
+
+    Without a local model every utterance would need a full (network)
+    recognition just to look for the wake word: the gate would save nothing.
+    """
+    for backend in getattr(stt, "backends", [stt]):
+        if HAS_VOSK and hasattr(backend, "model"):
+            return VoskKeywordSpotter(backend.model, wake_words)
+    return None
+
+
+class WakeWordGate:
+    """Only lets through the commands spoken after the wake word.
+
+    "assistant ouvre firefox" -> "ouvre firefox". A lone "assistant" arms
+    the gate: the next utterance (within armed_timeout seconds) is taken as
+    the command without needing the wake word again.
+    """
+
+    def __init__(self, spotter, stt, wake_words, armed_timeout=8):
+        self.spotter = spotter
+        self.stt = stt
+        self.wake_words = [normalize_text(w) for w in wake_words]
+        self.armed_timeout = armed_timeout
+        self._armed_until = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def armed(self):
+        return time.monotonic() < self._armed_until
+
+    def strip_wake_word(self, text):
+        """Returns the part of text after the wake word, or None if it isn't there."""
+        words = text.split()
+        folded = [normalize_text(w, strip_punctuation=True) for w in words]
+        for i, word in enumerate(folded):
+            if word in self.wake_words:
+                return " ".join(words[i + 1:]).strip(" ,.!?")
+        return None
+
+    def process(self, audio):
+        """Returns the command text for this utterance, or None if it must be ignored.
+
+        Raises the recognizer errors (sr.UnknownValueError...) like stt.recognize().
+        """
+        if self.armed:
+            self._armed_until = 0
+            self.accepted += 1
+            return self.stt.recognize(audio)
+
+        if not self.spotter.detect(audio):
+            self.rejected += 1
+            return None
+
+        self.accepted += 1
+        command = self.strip_wake_word(self.stt.recognize(audio))
+        if not command:
+            # Wake word alone: wait for the command in the next utterance
+            self._armed_until = time.monotonic() + self.armed_timeout
+            return None
+        return command
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import quote_plus
+from text_normalize import normalize_text
+from tracing import percentiles
+
+
+def watch_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def search_url(query):
+    return f"https://www.youtube.com/results?search_query={quote_plus(query)}"
+
+
+class YtDlpExtractor:
+    """yt_dlp kept loaded in-process: no interpreter start or extractor import per lookup."""
+
+    def __init__(self):
+        import yt_dlp
+        self._ydl = yt_dlp.YoutubeDL({
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "extract_flat": "in_playlist",
+        })
+        self._lock = threading.Lock() # YoutubeDL instances are not thread-safe
+
+    def __call__(self, query):
+        with self._lock:
+            info = self._ydl.extract_info(f"ytsearch1:{query}", download=False)
+        entries = info.get("entries") or []
+        return entries[0].get("id") if entries else None
+
+
+class YtDlpSubprocessExtractor:
+    """Previous behaviour (yt-dlp binary of the venv), used if the module can't be imported."""
+
+    def __call__(self, query):
+        yt_dlp_path = os.path.join(os.path.dirname(sys.executable), "yt-dlp")
+        result = subprocess.run(
+            [yt_dlp_path, f"ytsearch1:{query}", "--get-id", "--no-warnings"],
+            capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.strip() or None
+
+
+class StubExtractor:
+    """Test extractor: fixed latency, returns results[query] (or a fake id)."""
+
+    def __init__(self, latency=0.0, results=None):
+        self.latency = latency
+        self.results = results or {}
+        self.calls = 0
+
+    def __call__(self, query):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.results.get(query, f"stub{abs(hash(query)) % 10**8}")
+
+
+def default_extractor():
+    try:
+        return YtDlpExtractor()
+    except ImportError:
+        return YtDlpSubprocessExtractor()
+
+
+class YouTubeResolver:
+    """query -> YouTube URL, with a TTL cache and a latency budget.
+
+    If the lookup does not finish within budget seconds the search-results
+    URL is returned right away; the lookup keeps running in the background
+    and its result is cached for the next request.
+    """
+
+    def __init__(self, extractor=None, ttl=6 * 3600, budget=1.5):
+        self.ttl = ttl
+        self.budget = budget
+        self._extractor = extractor
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="youtube")
+        self._lock = threading.Lock() # cache and pending lookups only
+        self._init_lock = threading.Lock() # loading the extractor (seconds for yt_dlp)
+        self._cache = {} # key -> (timestamp, video_id)
+        self._pending = {} # key -> Future, identical lookups share one
+        self.latencies = deque(maxlen=1000)
+        self.hits = 0
+        self.fallbacks = 0
+
+    def warm_up(self):
+        """Loads the extractor in the background so the first lookup doesn't pay for it."""
+        return self._executor.submit(self._get_extractor)
+
+    def _get_extractor(self):
+        # Not under _lock: resolve() must reach its cache and budget while yt_dlp imports
+        if self._extractor is None:
+            with self._init_lock:
+                if self._extractor is None:
+                    self._extractor = default_extractor()
+        return self._extractor
+
+    def _lookup(self, key, query):
+        try:
+            video_id = self._get_extractor()(query)
+        except Exception as e:
+            print(f"Erreur yt-dlp: {e}")
+            video_id = None
+        with self._lock:
+            if video_id:
+                self._cache[key] = (time.time(), video_id)
+            self._pending.pop(key, None)
+        return video_id
+
+    def resolve(self, query):
+        """Returns the URL to open for query (video if found in time, else search results)."""
+        start = time.perf_counter()
+        key = normalize_text(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.time() - cached[0] < self.ttl:
+                self.hits += 1
+                self.latencies.append(time.perf_counter() - start)
+                return watch_url(cached[1])
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._lookup, key, query)
+                self._pending[key] = future
+
+        try:
+            video_id = future.result(timeout=self.budget)
+        except TimeoutError:
+            video_id = None
+            self.fallbacks += 1
+        url = watch_url(video_id) if video_id else search_url(query)
+        self.latencies.append(time.perf_counter() - start)
+        return url
+
+    def stats(self):
+        stats = {key: value * 1000 for key, value in percentiles(list(self.latencies)).items()}
+        stats.update({"requests": len(self.latencies), "cache_hits": self.hits, "budget_fallbacks": self.fallbacks})
+        return stats